@@ -1,63 +1,79 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
-from typing import Optional
+import jwt
+from jwt import InvalidTokenError as JWTError
 
+from app.core.cache import cache_user, get_cached_user, token_key
 from app.core.config import settings
 from app.services import user_service
-from app.schemas.token import TokenPayload
 from app.models.user import UserInDB
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
+# Bound once at import; settings are static for the life of the process
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHMS = [settings.ALGORITHM]
+
+async def _resolve_user(token: str, require_active: bool = False, require_admin: bool = False) -> UserInDB:
     """
-    Validate access token and return current user.
+    Validate access token, load the user and apply the requested checks in one pass.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    cache_key = token_key(token)
+    user = get_cached_user(cache_key)
     
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    if user is None:
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        token_data = TokenPayload(**payload)
-        user_id: Optional[str] = token_data.sub
-        if user_id is None:
+        
+        try:
+            payload = jwt.decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
+        except JWTError:
             raise credentials_exception
-    except (JWTError, ValidationError):
-        raise credentials_exception
+        
+        # Only "sub" is read, so skip building a TokenPayload model per request
+        user_id = payload.get("sub")
+        if not isinstance(user_id, str):
+            raise credentials_exception
+        
+        user = await user_service.get_user_by_id(user_id)
+        if user is None:
+            raise credentials_exception
+        
+        cache_user(cache_key, user, payload.get("exp", 0))
     
-    user = await user_service.get_user_by_id(user_id)
-    if user is None:
-        raise credentials_exception
+    if (require_active or require_admin) and not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    if require_admin and not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     
     return user
 
-async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
+    """
+    Validate access token and return current user.
+    """
+    return await _resolve_user(token)
+
+async def get_current_active_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
     """
     Ensure the user is active.
     """
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    return current_user
+    return await _resolve_user(token, require_active=True)
 
-async def get_current_admin_user(current_user: UserInDB = Depends(get_current_active_user)) -> UserInDB:
+async def get_current_admin_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
     """
     Ensure the user is an admin.
     """
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    return current_user
+    return await _resolve_user(token, require_admin=True)
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -10,19 +11,22 @@ from app.schemas.user import UserCreate, UserResponse
 
 router = APIRouter()
 
+_ACCESS_TOKEN_EXPIRES = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(user_data: UserCreate):
-    # Check if email already exists
-    existing_user = await user_service.get_user_by_email(user_data.email)
-    if existing_user:
+    # Check email and username uniqueness concurrently
+    email_user, username_user = await asyncio.gather(
+        user_service.get_user_by_email(user_data.email),
+        user_service.get_user_by_username(user_data.username)
+    )
+    if email_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Check if username already exists
-    existing_user = await user_service.get_user_by_username(user_data.username)
-    if existing_user:
+    if username_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -31,14 +35,7 @@ async def register_user(user_data: UserCreate):
     # Create new user
     user = await user_service.create_user(user_data)
     
-    # Convert to response model
-    return {
-        "id": str(user.id),
-        "email": user.email,
-        "username": user.username,
-        "is_active": user.is_active,
-        "is_admin": user.is_admin
-    }
+    return user
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
@@ -50,9 +47,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=str(user.id), expires_delta=access_token_expires
+        subject=str(user.id), expires_delta=_ACCESS_TOKEN_EXPIRES
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
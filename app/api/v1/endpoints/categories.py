@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
+from pymongo.errors import DuplicateKeyError
 
 from app.api.deps import get_current_user, get_current_active_user, get_current_admin_user
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.services import category_service, product_service
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
-from app.schemas.product import ProductResponse
+from app.schemas.product import ProductResponse, products_to_json
 from app.models.user import UserInDB
 
 router = APIRouter()
@@ -12,37 +14,41 @@ router = APIRouter()
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(get_current_admin_user)])
 async def create_category(category: CategoryCreate):
     # Check if category with same name already exists
-    existing_category = await category_service.get_category_by_name(category.name)
-    if existing_category:
+    if await category_service.category_name_exists(category.name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category with this name already exists"
         )
     
-    # Create category
-    created_category = await category_service.create_category(category)
+    # Create category; the unique name index settles a race with a concurrent create
+    try:
+        created_category = await category_service.create_category(category)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category with this name already exists"
+        )
     
-    return {
-        "id": str(created_category.id),
-        "name": created_category.name,
-        "description": created_category.description,
-        "created_at": str(created_category.created_at),
-        "updated_at": str(created_category.updated_at)
-    }
+    return created_category
 
 @router.get("/", response_model=List[CategoryResponse])
-async def get_categories(skip: int = 0, limit: int = 100):
-    categories = await category_service.get_all_categories(skip=skip, limit=limit)
-    
-    return [
-        {
-            "id": str(category.id),
-            "name": category.name,
-            "description": category.description,
-            "created_at": str(category.created_at),
-            "updated_at": str(category.updated_at)
-        } for category in categories
-    ]
+async def get_categories(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
+    after_id: Optional[str] = None
+):
+    categories = await category_service.get_all_categories(
+        skip=skip,
+        limit=limit,
+        projection=category_service.CATEGORY_LIST_PROJECTION,
+        after_id=after_id
+    )
+    if categories is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid after_id"
+        )
+    return categories
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: str):
@@ -53,35 +59,26 @@ async def get_category(category_id: str):
             detail="Category not found"
         )
     
-    return {
-        "id": str(category.id),
-        "name": category.name,
-        "description": category.description,
-        "created_at": str(category.created_at),
-        "updated_at": str(category.updated_at)
-    }
+    return category
 
 @router.put("/{category_id}", response_model=CategoryResponse, dependencies=[Depends(get_current_admin_user)])
 async def update_category(category_id: str, category_update: CategoryUpdate):
-    # Check if category exists
-    existing_category = await category_service.get_category_by_id(category_id)
-    if not existing_category:
+    # Check existence and name uniqueness in one round-trip
+    exists, name_taken = await category_service.check_category_update(category_id, category_update.name)
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
-    # Check if name is being updated and if it's already taken
-    if category_update.name and category_update.name != existing_category.name:
-        name_exists = await category_service.get_category_by_name(category_update.name)
-        if name_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category with this name already exists"
-            )
+    if name_taken:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category with this name already exists"
+        )
     
     # Update category
-    update_data = category_update.dict(exclude_unset=True)
+    update_data = category_update.model_dump(exclude_unset=True)
     updated_category = await category_service.update_category(category_id, update_data)
     
     if not updated_category:
@@ -90,27 +87,19 @@ async def update_category(category_id: str, category_update: CategoryUpdate):
             detail="Failed to update category"
         )
     
-    return {
-        "id": str(updated_category.id),
-        "name": updated_category.name,
-        "description": updated_category.description,
-        "created_at": str(updated_category.created_at),
-        "updated_at": str(updated_category.updated_at)
-    }
+    return updated_category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(get_current_admin_user)])
 async def delete_category(category_id: str):
     # Check if category exists
-    category = await category_service.get_category_by_id(category_id)
-    if not category:
+    if not await category_service.category_exists(category_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
     # Check if category has products
-    products = await product_service.get_products_by_category(category_id)
-    if products:
+    if await product_service.category_has_products(category_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with existing products"
@@ -124,29 +113,42 @@ async def delete_category(category_id: str):
         )
 
 @router.get("/{category_id}/products", response_model=List[ProductResponse])
-async def get_products_by_category(category_id: str, skip: int = 0, limit: int = 100):
-    # Check if category exists
-    category = await category_service.get_category_by_id(category_id)
-    if not category:
+async def get_products_by_category(
+    category_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    # Keyset pages resume from the cursor, so an offset on top would be silently dropped
+    if cursor is not None and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with cursor"
+        )
+    
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    # Read endpoint, so the cached lookup is fine here
+    if await category_service.get_category_by_id(category_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
-    products = await product_service.get_products_by_category(category_id, skip=skip, limit=limit)
+    products = await product_service.get_products_by_category(
+        category_id, skip=skip, limit=limit, after=after
+    )
     
-    return [
-        {
-            "id": str(product.id),
-            "name": product.name,
-            "description": product.description,
-            "price": product.price,
-            "stock": product.stock,
-            "category_id": str(product.category_id),
-            "is_active": product.is_active,
-            "image_url": product.image_url,
-            "tags": product.tags,
-            "created_at": str(product.created_at),
-            "updated_at": str(product.updated_at)
-        } for product in products
-    ]
+    # Serialized once here; returning a Response skips FastAPI's second validate-and-encode pass
+    response = Response(content=products_to_json(products), media_type="application/json")
+    if len(products) == limit:
+        last = products[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return response
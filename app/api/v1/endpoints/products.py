@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 
 from app.api.deps import get_current_user, get_current_active_user, get_current_admin_user
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.services import product_service, category_service
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductBulkCreate,
+    ProductBulkUpdate,
+    ProductBulkDelete,
+    ProductBulkResult,
+    products_to_json,
+)
 from app.models.user import UserInDB
 
 router = APIRouter()
@@ -11,8 +21,7 @@ router = APIRouter()
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(get_current_admin_user)])
 async def create_product(product: ProductCreate):
     # Verify category exists
-    category = await category_service.get_category_by_id(product.category_id)
-    if not category:
+    if not await category_service.category_exists(product.category_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category not found"
@@ -21,34 +30,86 @@ async def create_product(product: ProductCreate):
     # Create product
     created_product = await product_service.create_product(product)
     
-    return {
-        "id": str(created_product.id),
-        "name": created_product.name,
-        "description": created_product.description,
-        "price": created_product.price,
-        "stock": created_product.stock,
-        "category_id": str(created_product.category_id),
-        "is_active": created_product.is_active,
-        "image_url": created_product.image_url,
-        "tags": created_product.tags,
-        "created_at": str(created_product.created_at),
-        "updated_at": str(created_product.updated_at)
-    }
+    return created_product
+
+@router.post("/bulk", response_model=List[ProductResponse], status_code=status.HTTP_201_CREATED, dependencies=[Depends(get_current_admin_user)])
+async def bulk_create_products(payload: ProductBulkCreate):
+    # Verify every referenced category exists with one query
+    if not await category_service.categories_exist([product.category_id for product in payload.items]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category not found"
+        )
+    
+    return await product_service.bulk_create_products(payload.items)
+
+@router.patch("/bulk", response_model=ProductBulkResult, dependencies=[Depends(get_current_admin_user)])
+async def bulk_update_products(payload: ProductBulkUpdate):
+    category_ids = [item.category_id for item in payload.items if item.category_id]
+    if category_ids and not await category_service.categories_exist(category_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category not found"
+        )
+    
+    updates = [
+        (item.id, item.model_dump(exclude_unset=True, exclude={"id"}))
+        for item in payload.items
+    ]
+    counts = await product_service.bulk_update_products(updates)
+    if counts is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product id"
+        )
+    
+    matched_count, modified_count = counts
+    return ProductBulkResult(matched_count=matched_count, modified_count=modified_count)
+
+@router.post("/bulk/delete", response_model=ProductBulkResult, dependencies=[Depends(get_current_admin_user)])
+async def bulk_delete_products(payload: ProductBulkDelete):
+    deleted_count = await product_service.bulk_delete_products(payload.ids)
+    if deleted_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product id"
+        )
+    
+    return ProductBulkResult(deleted_count=deleted_count)
 
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
-    skip: int = 0, 
-    limit: int = 100, 
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     category_id: Optional[str] = None,
     search: Optional[str] = None,
     active_only: bool = True
 ):
+    # Keyset pages resume from the cursor, so an offset on top would be silently dropped
+    if cursor is not None and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with cursor"
+        )
+    
+    next_cursor = None
+    
     # Handle search first if provided
     if search:
         products = await product_service.search_products(search, skip=skip, limit=limit)
     else:
+        after = None
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if after is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+        
         # Build filter params
         filter_params = {}
         
@@ -67,23 +128,23 @@ async def get_products(
         if active_only:
             filter_params["is_active"] = True
         
-        products = await product_service.get_all_products(skip=skip, limit=limit, filter_params=filter_params)
+        products = await product_service.get_all_products(
+            skip=skip,
+            limit=limit,
+            filter_params=filter_params,
+            after=after
+        )
+        
+        # A full page may have more behind it; hand back the keyset token for it
+        if len(products) == limit:
+            last = products[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
     
-    return [
-        {
-            "id": str(product.id),
-            "name": product.name,
-            "description": product.description,
-            "price": product.price,
-            "stock": product.stock,
-            "category_id": str(product.category_id),
-            "is_active": product.is_active,
-            "image_url": product.image_url,
-            "tags": product.tags,
-            "created_at": str(product.created_at),
-            "updated_at": str(product.updated_at)
-        } for product in products
-    ]
+    # Serialized once here; returning a Response skips FastAPI's second validate-and-encode pass
+    response = Response(content=products_to_json(products), media_type="application/json")
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(product_id: str):
@@ -94,62 +155,29 @@ async def get_product(product_id: str):
             detail="Product not found"
         )
     
-    return {
-        "id": str(product.id),
-        "name": product.name,
-        "description": product.description,
-        "price": product.price,
-        "stock": product.stock,
-        "category_id": str(product.category_id),
-        "is_active": product.is_active,
-        "image_url": product.image_url,
-        "tags": product.tags,
-        "created_at": str(product.created_at),
-        "updated_at": str(product.updated_at)
-    }
+    return product
 
 @router.put("/{product_id}", response_model=ProductResponse, dependencies=[Depends(get_current_admin_user)])
 async def update_product(product_id: str, product_update: ProductUpdate):
-    # Check if product exists
-    existing_product = await product_service.get_product_by_id(product_id)
-    if not existing_product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
-        )
-    
     # Verify category exists if being updated
     if product_update.category_id:
-        category = await category_service.get_category_by_id(product_update.category_id)
-        if not category:
+        if not await category_service.category_exists(product_update.category_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category not found"
             )
     
-    # Update product
-    update_data = product_update.dict(exclude_unset=True)
+    # Update product; None means no document matched the id
+    update_data = product_update.model_dump(exclude_unset=True)
     updated_product = await product_service.update_product(product_id, update_data)
     
     if not updated_product:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update product"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
         )
     
-    return {
-        "id": str(updated_product.id),
-        "name": updated_product.name,
-        "description": updated_product.description,
-        "price": updated_product.price,
-        "stock": updated_product.stock,
-        "category_id": str(updated_product.category_id),
-        "is_active": updated_product.is_active,
-        "image_url": updated_product.image_url,
-        "tags": updated_product.tags,
-        "created_at": str(updated_product.created_at),
-        "updated_at": str(updated_product.updated_at)
-    }
+    return updated_product
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(get_current_admin_user)])
 async def delete_product(product_id: str):
@@ -0,0 +1,62 @@
+import hashlib
+import time
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+# Resolved users keyed by the digest of the bearer token that produced them.
+# Entries live for at most 30 seconds and never outlive the token's own expiry.
+_user_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Side index of user id -> token digests, so invalidation touches only that user's
+# entries. Same TTL, refreshed on every insert, so it outlives the keys it lists.
+_user_keys: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Categories keyed by ("id", <id>) and ("name", <name>); low-cardinality, read-mostly
+# data, so a short TTL bounds staleness from writes made by other replicas
+_category_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+def token_key(token: str) -> bytes:
+    """Hash a bearer token so raw credentials are never kept in memory."""
+    return hashlib.sha256(token.encode()).digest()
+
+def get_cached_user(key: bytes) -> Optional[Any]:
+    """Return the cached user for a token digest, or None if absent or expired."""
+    entry = _user_cache.get(key)
+    if entry is None:
+        return None
+    user, expires_at = entry
+    if expires_at <= time.time():
+        _user_cache.pop(key, None)
+        return None
+    return user
+
+def cache_user(key: bytes, user: Any, expires_at: float) -> None:
+    """Cache a resolved user until the token expires (capped by the cache TTL)."""
+    _user_cache[key] = (user, expires_at)
+    user_id = str(user.id)
+    # Prune digests the cache already expired or evicted, then re-set to restart the TTL
+    keys = {k for k in _user_keys.get(user_id, ()) if k in _user_cache}
+    keys.add(key)
+    _user_keys[user_id] = keys
+
+def invalidate_user(user_id: Any) -> None:
+    """Drop every cached entry for the given user, e.g. after an update."""
+    for key in _user_keys.pop(str(user_id), ()):
+        _user_cache.pop(key, None)
+
+def get_cached_category(field: str, value: str) -> Optional[Any]:
+    """Return the cached category looked up by "id" or "name", or None."""
+    return _category_cache.get((field, value))
+
+def cache_category(category: Any) -> None:
+    """Cache a category under both its id and its name."""
+    _category_cache[("id", str(category.id))] = category
+    _category_cache[("name", category.name)] = category
+
+def invalidate_category(category_id: Any) -> None:
+    """Drop every cached entry for the given category, e.g. after an update or delete."""
+    category_id = str(category_id)
+    for key, category in list(_category_cache.items()):
+        if str(category.id) == category_id:
+            _category_cache.pop(key, None)
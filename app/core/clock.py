@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """Timezone-aware current UTC time (datetime.utcnow() is naive and deprecated)."""
+    return datetime.now(timezone.utc)
@@ -9,9 +9,13 @@ class Settings(BaseModel):
     PROJECT_NAME: str = "E-Commerce Product Catalog API"
     
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017/ecommerce")
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "200"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "20"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "secret_key_for_dev_only_please_change_in_production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
     
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "dev")
     
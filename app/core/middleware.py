@@ -0,0 +1,45 @@
+import logging
+import time
+
+from fastapi.responses import ORJSONResponse
+
+
+class ProcessTimeMiddleware:
+    """
+    Pure ASGI middleware adding an X-Process-Time-Us header (integer microseconds) to every HTTP response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # Integer arithmetic and bytes formatting; no float/str allocations
+                duration_us = (time.perf_counter_ns() - start_ns) // 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time-us", b"%d" % duration_us))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logging.error(f"Error processing request: {e}")
+            if response_started:
+                raise
+            # Return a generic error response to avoid middleware failures
+            response = ORJSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error occurred"}
+            )
+            await response(scope, receive, send_wrapper)
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Response header carrying the token for the next page of a keyset-paginated list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, object_id: ObjectId) -> str:
+    """Serialize the sort key of the last returned row into an opaque token."""
+    raw = f"{created_at.isoformat()}|{object_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Optional[Tuple[datetime, ObjectId]]:
+    """Parse a token from encode_cursor, returning None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, object_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(object_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, InvalidId, TypeError):
+        return None
@@ -2,11 +2,11 @@ import asyncio
 import logging
 from bson import ObjectId
 
-from app.db.mongodb import database
-from app.services import user_service, category_service, product_service
+from app.db.mongodb import get_collection
+from app.services import user_service
 from app.models.user import UserCreate
-from app.models.category import CategoryCreate
-from app.models.product import ProductCreate
+from app.models.category import CategoryInDB
+from app.models.product import ProductInDB
 
 
 async def init_db():
@@ -22,13 +22,8 @@ async def init_db():
             username="admin",
             password="admin123"  # In production, use a strong password
         )
-        admin_user = await user_service.create_user(admin_data)
-        
-        # Make the user an admin
-        await database.users.update_one(
-            {"_id": admin_user.id},
-            {"$set": {"is_admin": True}}
-        )
+        # Insert with the admin flag already set so there is no window without it
+        admin_user = await user_service.create_user(admin_data, is_admin=True)
         logger.info(f"Admin user created with ID: {admin_user.id}")
     
     # Create initial categories if they don't exist
@@ -40,18 +35,27 @@ async def init_db():
         {"name": "Beauty & Personal Care", "description": "Beauty products and personal care items"}
     ]
     
-    category_ids = {}
+    # Look up all seed categories with a single query
+    categories_collection = get_collection("categories")
+    category_ids = {
+        document["name"]: document["_id"]
+        async for document in categories_collection.find(
+            {"name": {"$in": [category["name"] for category in categories]}},
+            {"name": 1}
+        )
+    }
     
-    for category_data in categories:
-        existing = await category_service.get_category_by_name(category_data["name"])
-        if not existing:
-            logger.info(f"Creating category: {category_data['name']}")
-            category = await category_service.create_category(
-                CategoryCreate(**category_data)
-            )
-            category_ids[category_data["name"]] = category.id
-        else:
-            category_ids[category_data["name"]] = existing.id
+    new_categories = [
+        CategoryInDB(**category_data)
+        for category_data in categories
+        if category_data["name"] not in category_ids
+    ]
+    if new_categories:
+        logger.info(f"Creating categories: {', '.join(c.name for c in new_categories)}")
+        await categories_collection.insert_many(
+            [category.model_dump(by_alias=True) for category in new_categories]
+        )
+        category_ids.update({category.name: category.id for category in new_categories})
     
     # Create initial products if they don't exist
     products = [
@@ -120,18 +124,26 @@ async def init_db():
         }
     ]
     
-    for product_data in products:
-        # Check if product with same name exists
-        existing_products = await product_service.get_all_products(
-            filter_params={"name": product_data["name"]}
+    # Look up all seed products with a single query
+    products_collection = get_collection("products")
+    existing_products = {
+        document["name"]
+        async for document in products_collection.find(
+            {"name": {"$in": [product["name"] for product in products]}},
+            {"name": 1}
+        )
+    }
+    
+    new_products = [
+        ProductInDB(**product_data)
+        for product_data in products
+        if product_data["name"] not in existing_products
+    ]
+    if new_products:
+        logger.info(f"Creating products: {', '.join(p.name for p in new_products)}")
+        await products_collection.insert_many(
+            [product.model_dump(by_alias=True) for product in new_products]
         )
-        
-        if not existing_products:
-            logger.info(f"Creating product: {product_data['name']}")
-            await product_service.create_product(
-                ProductCreate(**product_data)
-            )
-
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -1,38 +1,41 @@
 import motor.motor_asyncio
 import logging
 import asyncio
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
 from app.core.config import settings
 import functools
-from typing import Optional
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 
 # Global variables for lazy initialization
 client = None
 database = None
-products_collection = None
-categories_collection = None
-users_collection = None
+_collections: Dict[str, Any] = {}
 
 def get_db_name(url: str) -> str:
     """Extract database name from MongoDB URL"""
-    db_name = "ecommerce"
+    # Only standard connection strings select a database; Atlas (mongodb+srv://)
+    # URLs keep the "ecommerce" default. urlsplit drops the query string.
+    if not url.startswith('mongodb://'):
+        return "ecommerce"
     
-    # Handle both standard and Atlas connection strings
-    if url.startswith('mongodb://') and '/' in url[10:]:
-        parts = url.split('/')
-        if len(parts) > 3 and parts[3]:
-            potential_db = parts[3].split('?')[0]  # Remove query parameters if any
-            if potential_db:
-                db_name = potential_db
-    
-    return db_name
+    db_name = urlsplit(url).path.lstrip('/').split('/')[0]
+    return db_name or "ecommerce"
+
+# Settings are static, so the name is parsed once at import
+_DB_NAME = get_db_name(settings.MONGODB_URL)
 
 async def get_client() -> Optional[motor.motor_asyncio.AsyncIOMotorClient]:
     """Get a MongoDB client using the current event loop"""
-    global client
-    
     # Return existing client if already initialized
     if client is not None:
         return client
+    return _create_client()
+
+def _create_client() -> Optional[motor.motor_asyncio.AsyncIOMotorClient]:
+    """Build the client and store it in the module global (no I/O until first use)"""
+    global client
     
     # Set default MongoDB URL if not provided or invalid
     mongo_url = settings.MONGODB_URL
@@ -41,19 +44,21 @@ async def get_client() -> Optional[motor.motor_asyncio.AsyncIOMotorClient]:
         mongo_url = "mongodb://localhost:27017/ecommerce"
     
     try:
-        # Create a new client with the current event loop
-        loop = asyncio.get_event_loop()
+        # Motor binds to the running loop (uvloop under uvicorn) on first use
         new_client = motor.motor_asyncio.AsyncIOMotorClient(
             mongo_url,
-            io_loop=loop,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=5000
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=60000,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=2000,
+            connectTimeoutMS=5000,
+            socketTimeoutMS=5000,
+            retryWrites=True,
+            tz_aware=True,
+            compressors="zstd,zlib"
         )
         
-        # Ping the server to confirm connection
-        await new_client.admin.command('ping')
-        logging.info("Successfully connected to MongoDB")
-        
         # Update global client
         client = new_client
         return client
@@ -61,71 +66,110 @@ async def get_client() -> Optional[motor.motor_asyncio.AsyncIOMotorClient]:
         logging.error(f"MongoDB connection error: {e}")
         return None
 
-async def get_database():
-    """Get the database using the current event loop"""
-    global database, client
+def close_client() -> None:
+    """Close the shared client, releasing its pool, and forget the cached handles"""
+    global client, database
+    
+    if client is not None:
+        client.close()
+    client = None
+    database = None
+    _collections.clear()
+
+async def ping_database() -> bool:
+    """Round-trip a ping to the server to confirm it is reachable"""
+    mongo_client = await get_client()
+    if mongo_client is None:
+        return False
+    
+    try:
+        await mongo_client.admin.command('ping')
+        return True
+    except Exception as e:
+        logging.error(f"MongoDB ping failed: {e}")
+        return False
+
+async def warm_pool() -> None:
+    """Open minPoolSize connections up front so the first burst doesn't pay for the handshakes"""
+    mongo_client = await get_client()
+    if mongo_client is None:
+        return
+    
+    await asyncio.gather(*(
+        mongo_client.admin.command('ping')
+        for _ in range(settings.MONGO_MIN_POOL_SIZE)
+    ))
+
+def _get_database():
+    """Return the database handle, building the client on first use"""
+    global database
     
     if database is not None:
         return database
     
-    # Get client
-    client = await get_client()
-    if client is None:
+    mongo_client = client if client is not None else _create_client()
+    if mongo_client is None:
         return None
     
-    # Extract database name from MONGODB_URL
-    db_name = get_db_name(settings.MONGODB_URL)
-    
     # Set global database
-    database = client[db_name]
+    database = mongo_client[_DB_NAME]
     return database
 
-async def get_products_collection():
-    """Get the products collection using the current event loop"""
-    global products_collection
-    
-    if products_collection is not None:
-        return products_collection
-    
-    db = await get_database()
-    if db is None:
-        return None
-    
-    products_collection = db.products
-    return products_collection
-
-async def get_categories_collection():
-    """Get the categories collection using the current event loop"""
-    global categories_collection
-    
-    if categories_collection is not None:
-        return categories_collection
-    
-    db = await get_database()
-    if db is None:
-        return None
-    
-    categories_collection = db.categories
-    return categories_collection
+async def get_database():
+    """Get the database using the current event loop"""
+    return _get_database()
 
-async def get_users_collection():
-    """Get the users collection using the current event loop"""
-    global users_collection
+def get_collection(collection_name: str):
+    """
+    Get a collection by name, cached after the first lookup.
     
-    if users_collection is not None:
-        return users_collection
+    Synchronous: building the handle does no I/O, so callers skip an await per operation.
+    """
+    collection = _collections.get(collection_name)
+    if collection is not None:
+        return collection
     
-    db = await get_database()
+    db = _get_database()
     if db is None:
-        return None
+        raise ConnectionError("MongoDB connection not available")
     
-    users_collection = db.users
-    return users_collection
+    collection = _collections[collection_name] = db[collection_name]
+    return collection
 
-async def get_collection(collection_name: str):
-    """Get a collection by name using the current event loop"""
-    db = await get_database()
-    if db is None:
-        raise ConnectionError("MongoDB connection not available")
+async def ensure_indexes():
+    """Create the indexes backing the service-layer queries (idempotent)"""
+    products = get_collection("products")
+    categories = get_collection("categories")
+    users = get_collection("users")
+    
+    await products.create_indexes([
+        # Filtered listing: equality (category_id, is_active), then the sort keys,
+        # then the price range, so filter + sort + range resolve within one index
+        IndexModel([
+            ("category_id", ASCENDING), ("is_active", ASCENDING),
+            ("created_at", DESCENDING), ("_id", DESCENDING), ("price", ASCENDING)
+        ]),
+        # Newest-first listings (created_at, _id tie-break) for keyset pages:
+        # all products, the storefront (is_active) and per-category pages
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("category_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ])
+    
+    # Search relevance: name matches outrank tags, which outrank description.
+    # Kept separate so an older unweighted text index only fails this call.
+    try:
+        await products.create_index(
+            [("name", TEXT), ("description", TEXT), ("tags", TEXT)],
+            weights={"name": 10, "tags": 5, "description": 1}
+        )
+    except OperationFailure as e:
+        logging.warning(
+            f"Products text index not updated ({e}); drop the existing text index to apply the new weights"
+        )
     
-    return db[collection_name]
\ No newline at end of file
+    await users.create_indexes([
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)], unique=True),
+    ])
+    await categories.create_index([("name", ASCENDING)], unique=True)
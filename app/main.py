@@ -1,18 +1,21 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
-import time
 import logging
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.middleware import ProcessTimeMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Set all CORS enabled origins
@@ -22,37 +25,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Timing header as plain ASGI middleware (no per-request task or stream hop)
+app.add_middleware(ProcessTimeMiddleware)
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """
     Handle validation errors.
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
-        content={"detail": exc.errors()},
+        content={"detail": jsonable_encoder(exc.errors())},
     )
 
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """
-    Add process time header to response.
-    """
-    start_time = time.time()
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-    except Exception as e:
-        logging.error(f"Error processing request: {e}")
-        # Return a generic error response to avoid middleware failures
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error occurred"}
-        )
-
 @app.get("/", include_in_schema=False)
 async def root():
     return {"message": "Welcome to the E-Commerce Product Catalog API"}
@@ -67,6 +55,13 @@ async def health_check():
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def warm_openapi_schema():
+    """
+    Build and cache the OpenAPI schema before the first /docs request
+    """
+    app.openapi()
+
 # Startup event to initialize the database with sample data if needed
 @app.on_event("startup")
 async def initialize_db():
@@ -90,6 +85,22 @@ async def initialize_db():
     else:
         logging.warning(f"MongoDB URL may be invalid: {mongo_url[:10]}...")
     
+    from app.db.mongodb import ping_database, warm_pool
+    if await ping_database():
+        logging.info("Successfully connected to MongoDB")
+        try:
+            await warm_pool()
+        except Exception as e:
+            logging.error(f"Error warming MongoDB connection pool: {e}")
+    else:
+        logging.error("MongoDB is not reachable at startup")
+    
+    try:
+        from app.db.mongodb import ensure_indexes
+        await ensure_indexes()
+    except Exception as e:
+        logging.error(f"Error creating database indexes: {e}")
+    
     if settings.ENVIRONMENT == "dev":
         try:
             from app.db.init_db import init_db
@@ -98,6 +109,14 @@ async def initialize_db():
         except Exception as e:
             logging.error(f"Error initializing database: {e}")
 
+@app.on_event("shutdown")
+async def close_db():
+    """
+    Release the MongoDB connection pool on shutdown
+    """
+    from app.db.mongodb import close_client
+    close_client()
+
 if __name__ == "__main__":
     import uvicorn
     logging.basicConfig(
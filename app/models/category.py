@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
-from bson import ObjectId
+from app.core.clock import utcnow
 from app.models.object_id import PyObjectId
 
 class CategoryBase(BaseModel):
@@ -17,20 +17,12 @@ class CategoryUpdate(CategoryBase):
 
 class CategoryInDB(CategoryBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
     model_config = {
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "json_encoders": {ObjectId: str},
-        "json_schema_extra": {
-            "example": {
-                "_id": "60d21b4967d0d8992e610c85",
-                "name": "Category Name",
-                "description": "Category Description"
-            }
-        }
+        "arbitrary_types_allowed": True
     }
     
     def __str__(self) -> str:
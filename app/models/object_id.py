@@ -1,19 +1,46 @@
 from bson import ObjectId
-from typing import Any, Annotated, ClassVar, get_type_hints
+from bson.errors import InvalidId
+from typing import Any, Annotated, Optional
 import pydantic.json_schema
 from pydantic_core import CoreSchema, core_schema
-from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler, field_serializer, BeforeValidator
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
 
 
 def validate_object_id(v: Any) -> ObjectId:
     """Validate that the value is a valid ObjectId."""
-    if isinstance(v, ObjectId):
+    if v.__class__ is ObjectId:
+        return v
+    if isinstance(v, str) and len(v) == 24:
+        # ObjectId() validates the hex itself; is_valid() would parse it twice
+        try:
+            return ObjectId(v)
+        except InvalidId:
+            pass
+    elif isinstance(v, ObjectId):
         return v
-    if isinstance(v, str) and ObjectId.is_valid(v):
-        return ObjectId(v)
     raise ValueError(f"Invalid ObjectId: {v}")
 
 
+# The all-zero id carries an epoch timestamp, so ObjectId() never mints it; clients
+# use it as a "no such document" probe, which lookups answer without a query
+NULL_OBJECT_ID = ObjectId("0" * 24)
+
+
+def parse_object_id(value: Any) -> Optional[ObjectId]:
+    """Parse an id once, returning None when it is not a valid ObjectId."""
+    if value is None:
+        # ObjectId(None) would mint a fresh id rather than fail
+        return None
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+# Bound once so the serializer dispatches straight to ObjectId.__str__
+_oid_to_str = ObjectId.__str__
+
+
 class PydanticObjectId(ObjectId):
     """Pydantic compatible ObjectId implementation."""
     
@@ -24,17 +51,17 @@ class PydanticObjectId(ObjectId):
         _handler: GetCoreSchemaHandler
     ) -> CoreSchema:
         """Generate schema for ObjectId."""
-        return core_schema.union_schema([
-            # Handle ObjectId instances
-            core_schema.is_instance_schema(ObjectId),
-            # Handle strings and validate them as ObjectId format
-            core_schema.chain_schema([
-                core_schema.str_schema(),
-                core_schema.no_info_plain_validator_function(validate_object_id),
-            ]),
-        ], serialization=core_schema.plain_serializer_function_ser_schema(
-            lambda x: str(x)
-        ))
+        # A single validator handles both ObjectId instances and hex strings,
+        # instead of a union that tries an instance check and then a str chain
+        return core_schema.no_info_plain_validator_function(
+            validate_object_id,
+            # Stringify only for JSON; python-mode dumps keep real ObjectIds for MongoDB
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _oid_to_str,
+                return_schema=core_schema.str_schema(),
+                when_used='json'
+            )
+        )
     
     @classmethod
     def __get_pydantic_json_schema__(
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from app.core.clock import utcnow
 from app.models.object_id import PyObjectId
 
 class ProductBase(BaseModel):
@@ -28,23 +29,12 @@ class ProductUpdate(BaseModel):
 
 class ProductInDB(ProductBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
     model_config = {
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "json_schema_extra": {
-            "example": {
-                "_id": "60d21b4967d0d8992e610c85",
-                "name": "Product Name",
-                "description": "Product Description",
-                "price": 99.99,
-                "stock": 100,
-                "category_id": "60d21b4967d0d8992e610c86",
-                "is_active": True
-            }
-        }
+        "arbitrary_types_allowed": True
     }
 
 class Product(ProductBase):
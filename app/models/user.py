@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import AliasChoices, BaseModel, Field, EmailStr
+from app.core.clock import utcnow
 from app.models.object_id import PyObjectId
 
 class UserBase(BaseModel):
@@ -15,26 +16,16 @@ class UserCreate(UserBase):
 class UserInDB(UserBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     hashed_password: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
     model_config = {
         "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "json_schema_extra": {
-            "example": {
-                "_id": "60d21b4967d0d8992e610c85",
-                "email": "user@example.com",
-                "username": "username",
-                "hashed_password": "hashed_password",
-                "is_active": True,
-                "is_admin": False
-            }
-        }
+        "arbitrary_types_allowed": True
     }
 
 class User(UserBase):
-    id: str
+    id: PyObjectId = Field(validation_alias=AliasChoices("id", "_id"))
     created_at: datetime
     updated_at: datetime
 
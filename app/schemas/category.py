@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
+from app.models.object_id import PyObjectId
 
 class CategoryCreate(BaseModel):
     name: str
@@ -10,8 +12,19 @@ class CategoryUpdate(BaseModel):
     description: Optional[str] = None
 
 class CategoryResponse(BaseModel):
-    id: str
+    id: PyObjectId = Field(validation_alias=AliasChoices("id", "_id"))
     name: str
     description: Optional[str]
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "id": "60d21b4967d0d8992e610c85",
+                "name": "Category Name",
+                "description": "Category Description"
+            }
+        }
+    }
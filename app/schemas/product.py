@@ -1,5 +1,8 @@
+from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, TypeAdapter
+from app.models.object_id import PyObjectId
+from app.models.product import ProductInDB
 
 class ProductCreate(BaseModel):
     name: str
@@ -22,14 +25,57 @@ class ProductUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 class ProductResponse(BaseModel):
-    id: str
+    id: PyObjectId = Field(validation_alias=AliasChoices("id", "_id"))
     name: str
     description: str
     price: float
     stock: int
-    category_id: str
+    category_id: PyObjectId
     is_active: bool
     image_url: Optional[str]
     tags: List[str]
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "id": "60d21b4967d0d8992e610c85",
+                "name": "Product Name",
+                "description": "Product Description",
+                "price": 99.99,
+                "stock": 100,
+                "category_id": "60d21b4967d0d8992e610c86",
+                "is_active": True
+            }
+        }
+    }
+
+# Validates and serializes a whole page in one pydantic-core call each
+_PRODUCT_RESPONSE_LIST = TypeAdapter(List[ProductResponse])
+
+def products_to_json(products: List[ProductInDB]) -> bytes:
+    """Serialize a page of products as ProductResponse JSON, for handlers returning a raw Response"""
+    # Validated against the response model, so fields that exist only on the stored model never leak
+    return _PRODUCT_RESPONSE_LIST.dump_json(_PRODUCT_RESPONSE_LIST.validate_python(products, from_attributes=True))
+
+# Upper bound on items per bulk request, keeping one batch within a single server command
+BULK_MAX_ITEMS = 1000
+
+class ProductBulkCreate(BaseModel):
+    items: List[ProductCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ProductBulkUpdateItem(ProductUpdate):
+    id: str
+
+class ProductBulkUpdate(BaseModel):
+    items: List[ProductBulkUpdateItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ProductBulkDelete(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ProductBulkResult(BaseModel):
+    matched_count: int = 0
+    modified_count: int = 0
+    deleted_count: int = 0
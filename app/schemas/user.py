@@ -1,5 +1,6 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
+from app.models.object_id import PyObjectId
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -12,8 +13,21 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 class UserResponse(BaseModel):
-    id: str
+    id: PyObjectId = Field(validation_alias=AliasChoices("id", "_id"))
     email: EmailStr
     username: str
     is_active: bool
     is_admin: bool
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "id": "60d21b4967d0d8992e610c85",
+                "email": "user@example.com",
+                "username": "username",
+                "is_active": True,
+                "is_admin": False
+            }
+        }
+    }
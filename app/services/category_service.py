@@ -1,76 +1,166 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
 from bson import ObjectId
-from app.db.mongodb import get_categories_collection
+from pymongo import ReturnDocument
+from app.core.cache import cache_category, get_cached_category, invalidate_category
+from app.db.mongodb import get_collection
 from app.models.category import CategoryInDB, CategoryCreate, CategoryUpdate
+from app.models.object_id import NULL_OBJECT_ID, parse_object_id
+
+# Fields needed to render a category. Reads that use it trust the stored
+# documents (validated on write) and build models with model_construct
+CATEGORY_LIST_PROJECTION = {"name": 1, "description": 1, "created_at": 1, "updated_at": 1}
 
 async def create_category(category: CategoryCreate) -> CategoryInDB:
-    # Create the database model object
-    category_in_db = CategoryInDB(**category.model_dump())
+    # Create the database model object; CategoryCreate is already validated
+    category_in_db = CategoryInDB.model_construct(**category.__dict__)
     
     # Convert to dict for MongoDB
     category_dict = category_in_db.model_dump(by_alias=True)
     
     # Get collection and insert
-    collection = await get_categories_collection()
-    new_category = await collection.insert_one(category_dict)
-    
-    # Retrieve the inserted document
-    created_category = await collection.find_one({"_id": new_category.inserted_id})
+    collection = get_collection("categories")
+    await collection.insert_one(category_dict)
     
-    # Create and return the model object
-    return CategoryInDB(**created_category)
+    # The model already holds exactly what was written (including _id), so no re-read
+    return category_in_db
 
 async def get_category_by_id(category_id: str) -> Optional[CategoryInDB]:
-    if not ObjectId.is_valid(category_id):
-        return None
+    cached = get_cached_category("id", category_id)
+    if cached is not None:
+        return cached
     
-    try:
-        obj_id = ObjectId(category_id)
-        collection = await get_categories_collection()
-        category_data = await collection.find_one({"_id": obj_id})
-        
-        if category_data:
-            return CategoryInDB(**category_data)
-        return None
-    except Exception:
+    obj_id = parse_object_id(category_id)
+    if obj_id is None or obj_id == NULL_OBJECT_ID:
         return None
+    
+    collection = get_collection("categories")
+    category_data = await collection.find_one({"_id": obj_id}, CATEGORY_LIST_PROJECTION)
+    if category_data:
+        category = CategoryInDB.model_construct(**category_data)
+        cache_category(category)
+        return category
+    return None
+
+async def category_exists(category_id: str) -> bool:
+    """Existence check for writes; always asks MongoDB, never the per-process cache"""
+    obj_id = parse_object_id(category_id)
+    if obj_id is None:
+        return False
+    return await _category_exists(obj_id)
+
+async def _category_exists(obj_id: ObjectId) -> bool:
+    collection = get_collection("categories")
+    category_data = await collection.find_one({"_id": obj_id}, {"_id": 1})
+    return category_data is not None
+
+async def categories_exist(category_ids: List[str]) -> bool:
+    """Check that every id in a batch names an existing category, with one query"""
+    obj_ids = set()
+    for category_id in category_ids:
+        obj_id = parse_object_id(category_id)
+        if obj_id is None:
+            return False
+        obj_ids.add(obj_id)
+    
+    collection = get_collection("categories")
+    cursor = collection.find({"_id": {"$in": list(obj_ids)}}, {"_id": 1})
+    documents = await cursor.to_list(length=len(obj_ids))
+    return len(documents) == len(obj_ids)
+
+async def check_category_update(category_id: str, name: Optional[str] = None) -> Tuple[bool, bool]:
+    """
+    Return (exists, name_taken) for a pending update with a single query.
+    """
+    obj_id = parse_object_id(category_id)
+    if obj_id is None:
+        return False, False
+    
+    if not name:
+        return await _category_exists(obj_id), False
+    
+    collection = get_collection("categories")
+    cursor = collection.find({"$or": [{"_id": obj_id}, {"name": name}]}, {"_id": 1})
+    documents = await cursor.to_list(length=2)
+    exists = any(document["_id"] == obj_id for document in documents)
+    name_taken = any(document["_id"] != obj_id for document in documents)
+    return exists, name_taken
+
+async def category_name_exists(name: str) -> bool:
+    """Uniqueness check for writes; always asks MongoDB, never the per-process cache"""
+    collection = get_collection("categories")
+    category_data = await collection.find_one({"name": name}, {"_id": 1})
+    return category_data is not None
 
 async def get_category_by_name(name: str) -> Optional[CategoryInDB]:
-    collection = await get_categories_collection()
-    category_data = await collection.find_one({"name": name})
+    cached = get_cached_category("name", name)
+    if cached is not None:
+        return cached
+    
+    collection = get_collection("categories")
+    category_data = await collection.find_one({"name": name}, CATEGORY_LIST_PROJECTION)
     if category_data:
-        return CategoryInDB(**category_data)
+        category = CategoryInDB.model_construct(**category_data)
+        cache_category(category)
+        return category
     return None
 
 async def update_category(category_id: str, update_data: Dict[str, Any]) -> Optional[CategoryInDB]:
-    if not ObjectId.is_valid(category_id):
+    obj_id = parse_object_id(category_id)
+    if obj_id is None:
         return None
     
-    update_data["updated_at"] = datetime.utcnow()
+    # The server stamps updated_at; $set is omitted when only the timestamp changes
+    update = {"$currentDate": {"updated_at": True}}
+    if update_data:
+        update["$set"] = update_data
     
-    collection = await get_categories_collection()
-    await collection.update_one(
-        {"_id": ObjectId(category_id)},
-        {"$set": update_data}
+    collection = get_collection("categories")
+    
+    updated_category = await collection.find_one_and_update(
+        {"_id": obj_id},
+        update,
+        projection=CATEGORY_LIST_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_category = await collection.find_one({"_id": ObjectId(category_id)})
+    # Drop cached lookups (including the old name) so the next read sees the new state
+    invalidate_category(obj_id)
+    
     if updated_category:
         return CategoryInDB(**updated_category)
     return None
 
 async def delete_category(category_id: str) -> bool:
-    if not ObjectId.is_valid(category_id):
+    obj_id = parse_object_id(category_id)
+    if obj_id is None:
         return False
-    collection = await get_categories_collection()
-    result = await collection.delete_one({"_id": ObjectId(category_id)})
+    collection = get_collection("categories")
+    result = await collection.delete_one({"_id": obj_id})
+    invalidate_category(obj_id)
     return result.deleted_count > 0
 
-async def get_all_categories(skip: int = 0, limit: int = 100) -> List[CategoryInDB]:
-    categories = []
-    collection = await get_categories_collection()
-    cursor = collection.find().skip(skip).limit(limit).sort("name", 1)
-    async for document in cursor:
-        categories.append(CategoryInDB(**document))
-    return categories
+async def get_all_categories(
+    skip: int = 0,
+    limit: int = 100,
+    projection: Optional[Dict[str, Any]] = None,
+    after_id: Optional[str] = None
+) -> Optional[List[CategoryInDB]]:
+    """
+    List categories by name. With after_id, resume after that category (keyset on the
+    unique name index); returns None when after_id does not name an existing category.
+    """
+    collection = get_collection("categories")
+    if after_id is not None:
+        after_oid = parse_object_id(after_id)
+        if after_oid is None:
+            return None
+        after_category = await collection.find_one({"_id": after_oid}, {"name": 1})
+        if after_category is None:
+            return None
+        # Same order as the first page; names are unique, so name alone is a total order
+        cursor = collection.find({"name": {"$gt": after_category["name"]}}, projection)
+    else:
+        cursor = collection.find({}, projection).skip(skip)
+    cursor = cursor.sort("name", 1).limit(limit).batch_size(limit)
+    documents = await cursor.to_list(length=limit)
+    return [CategoryInDB.model_construct(**document) for document in documents]
@@ -1,97 +1,207 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from bson import ObjectId
-from app.db.mongodb import get_products_collection
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument, UpdateOne
+from app.db.mongodb import get_collection
+from app.models.object_id import NULL_OBJECT_ID, parse_object_id, validate_object_id
 from app.models.product import ProductInDB, ProductCreate, ProductUpdate
 
+# Listing order; _id breaks created_at ties so keyset pages never skip or repeat rows
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+# Validates a whole page of documents in one pydantic-core call
+_PRODUCT_LIST = TypeAdapter(List[ProductInDB])
+
+# Fields needed to render a product in list responses; the default for every list and search
+# query, so stray or future bulky document fields never cross the wire on hot paths
+PRODUCT_LIST_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "price": 1,
+    "stock": 1,
+    "category_id": 1,
+    "is_active": 1,
+    "image_url": 1,
+    "tags": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+def _coerce_category_id(data: Dict[str, Any]) -> None:
+    """Store a string category_id as an ObjectId, parsing it once"""
+    category_id = data.get("category_id")
+    if isinstance(category_id, str):
+        obj_id = parse_object_id(category_id)
+        if obj_id is not None:
+            data["category_id"] = obj_id
+
+def _product_in_db(product: ProductCreate) -> ProductInDB:
+    """Build the stored model from already-validated input without a second validation pass"""
+    product_data = product.model_dump()
+    product_data["category_id"] = validate_object_id(product_data["category_id"])
+    return ProductInDB.model_construct(**product_data)
+
 async def create_product(product: ProductCreate) -> ProductInDB:
-    product_data = product.dict()
-    
-    # Convert string category_id to ObjectId
-    if isinstance(product_data["category_id"], str) and ObjectId.is_valid(product_data["category_id"]):
-        product_data["category_id"] = ObjectId(product_data["category_id"])
+    product_in_db = _product_in_db(product)
+    collection = get_collection("products")
+    await collection.insert_one(product_in_db.model_dump(by_alias=True))
     
-    product_in_db = ProductInDB(**product_data)
-    collection = await get_products_collection()
-    new_product = await collection.insert_one(product_in_db.dict(by_alias=True))
-    created_product = await collection.find_one({"_id": new_product.inserted_id})
-    return ProductInDB(**created_product)
+    # The model already holds exactly what was written (including _id), so no re-read
+    return product_in_db
 
 async def get_product_by_id(product_id: str) -> Optional[ProductInDB]:
-    if not ObjectId.is_valid(product_id):
+    obj_id = parse_object_id(product_id)
+    if obj_id is None or obj_id == NULL_OBJECT_ID:
         return None
-    collection = await get_products_collection()
-    product_data = await collection.find_one({"_id": ObjectId(product_id)})
+    collection = get_collection("products")
+    product_data = await collection.find_one({"_id": obj_id})
     if product_data:
         return ProductInDB(**product_data)
     return None
 
+def _product_update(update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the update document for a product patch"""
+    _coerce_category_id(update_data)
+    
+    # The server stamps updated_at; $set is omitted when only the timestamp changes
+    update = {"$currentDate": {"updated_at": True}}
+    if update_data:
+        update["$set"] = update_data
+    return update
+
 async def update_product(product_id: str, update_data: Dict[str, Any]) -> Optional[ProductInDB]:
-    if not ObjectId.is_valid(product_id):
+    obj_id = parse_object_id(product_id)
+    if obj_id is None:
         return None
     
-    # Convert string category_id to ObjectId if it exists in update_data
-    if "category_id" in update_data and isinstance(update_data["category_id"], str) and ObjectId.is_valid(update_data["category_id"]):
-        update_data["category_id"] = ObjectId(update_data["category_id"])
-    
-    update_data["updated_at"] = datetime.utcnow()
+    collection = get_collection("products")
     
-    collection = await get_products_collection()
-    await collection.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": update_data}
+    updated_product = await collection.find_one_and_update(
+        {"_id": obj_id},
+        _product_update(update_data),
+        return_document=ReturnDocument.AFTER
     )
-    
-    updated_product = await collection.find_one({"_id": ObjectId(product_id)})
     if updated_product:
         return ProductInDB(**updated_product)
     return None
 
 async def delete_product(product_id: str) -> bool:
-    if not ObjectId.is_valid(product_id):
+    obj_id = parse_object_id(product_id)
+    if obj_id is None:
         return False
-    collection = await get_products_collection()
-    result = await collection.delete_one({"_id": ObjectId(product_id)})
+    collection = get_collection("products")
+    result = await collection.delete_one({"_id": obj_id})
     return result.deleted_count > 0
 
-async def get_all_products(skip: int = 0, limit: int = 100, filter_params: Dict[str, Any] = None) -> List[ProductInDB]:
-    query = filter_params or {}
+async def bulk_create_products(products: List[ProductCreate]) -> List[ProductInDB]:
+    """Insert a batch of products with a single insert command"""
+    products_in_db = [_product_in_db(product) for product in products]
+    collection = get_collection("products")
+    await collection.insert_many(
+        [product_in_db.model_dump(by_alias=True) for product_in_db in products_in_db],
+        ordered=False
+    )
+    return products_in_db
+
+async def bulk_update_products(updates: List[Tuple[str, Dict[str, Any]]]) -> Optional[Tuple[int, int]]:
+    """
+    Apply (product_id, update_data) patches in one bulk_write; returns (matched, modified).
     
-    # Convert string category_id to ObjectId if it exists in filter_params
-    if "category_id" in query and isinstance(query["category_id"], str) and ObjectId.is_valid(query["category_id"]):
-        query["category_id"] = ObjectId(query["category_id"])
+    Unordered, so the server may apply the patches in parallel. Returns None, writing
+    nothing, if any id is not a valid ObjectId.
+    """
+    requests = []
+    for product_id, update_data in updates:
+        obj_id = parse_object_id(product_id)
+        if obj_id is None:
+            return None
+        requests.append(UpdateOne({"_id": obj_id}, _product_update(update_data)))
     
-    products = []
-    collection = await get_products_collection()
-    cursor = collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
-    async for document in cursor:
-        products.append(ProductInDB(**document))
-    return products
+    collection = get_collection("products")
+    result = await collection.bulk_write(requests, ordered=False)
+    return result.matched_count, result.modified_count
 
-async def search_products(search_term: str, skip: int = 0, limit: int = 100) -> List[ProductInDB]:
-    query = {
-        "$or": [
-            {"name": {"$regex": search_term, "$options": "i"}},
-            {"description": {"$regex": search_term, "$options": "i"}},
-            {"tags": {"$in": [search_term]}}
+async def bulk_delete_products(product_ids: List[str]) -> Optional[int]:
+    """
+    Delete a batch of products with a single delete command; returns the number removed.
+    
+    Returns None, deleting nothing, if any id is not a valid ObjectId.
+    """
+    obj_ids = list(map(parse_object_id, product_ids))
+    if None in obj_ids:
+        return None
+    
+    collection = get_collection("products")
+    result = await collection.delete_many({"_id": {"$in": obj_ids}})
+    return result.deleted_count
+
+def _newest_first_page(collection, query, projection, skip, limit, after):
+    """Newest-first cursor; with `after` it resumes below that (created_at, _id) key instead of skipping"""
+    # batch_size(limit) lets the first reply carry the whole page (the server default stops at 101 docs)
+    if after is not None:
+        created_at, object_id = after
+        keyset = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}},
         ]
-    }
+        # A new dict, so the caller's filter is left alone; an existing $or is kept via $and
+        if "$or" in query:
+            query = {"$and": [query, {"$or": keyset}]}
+        else:
+            query = {**query, "$or": keyset}
+        return collection.find(query, projection).sort(NEWEST_FIRST).limit(limit).batch_size(limit)
+    return collection.find(query, projection).sort(NEWEST_FIRST).skip(skip).limit(limit).batch_size(limit)
+
+async def get_all_products(
+    skip: int = 0,
+    limit: int = 100,
+    filter_params: Dict[str, Any] = None,
+    projection: Optional[Dict[str, Any]] = PRODUCT_LIST_PROJECTION,
+    after: Optional[Tuple[datetime, ObjectId]] = None
+) -> List[ProductInDB]:
+    # Copied, since the category_id coercion below writes into it
+    query = dict(filter_params or {})
+    
+    _coerce_category_id(query)
     
-    products = []
-    collection = await get_products_collection()
-    cursor = collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
-    async for document in cursor:
-        products.append(ProductInDB(**document))
-    return products
-
-async def get_products_by_category(category_id: str, skip: int = 0, limit: int = 100) -> List[ProductInDB]:
-    if not ObjectId.is_valid(category_id):
+    collection = get_collection("products")
+    cursor = _newest_first_page(collection, query, projection, skip, limit, after)
+    documents = await cursor.to_list(length=limit)
+    return _PRODUCT_LIST.validate_python(documents)
+
+async def search_products(search_term: str, skip: int = 0, limit: int = 100) -> List[ProductInDB]:
+    # Served by the text index on name, description and tags, best matches first
+    query = {"$text": {"$search": search_term}, "is_active": True}
+    text_score = {"$meta": "textScore"}
+    projection = {**PRODUCT_LIST_PROJECTION, "score": text_score}
+    
+    collection = get_collection("products")
+    cursor = collection.find(query, projection).sort([("score", text_score)]).skip(skip).limit(limit).batch_size(limit)
+    documents = await cursor.to_list(length=limit)
+    return _PRODUCT_LIST.validate_python(documents)
+
+async def category_has_products(category_id: str) -> bool:
+    """Check whether any product references the category; fetches at most one _id"""
+    category_oid = parse_object_id(category_id)
+    if category_oid is None:
+        return False
+    collection = get_collection("products")
+    product_data = await collection.find_one({"category_id": category_oid}, {"_id": 1})
+    return product_data is not None
+
+async def get_products_by_category(
+    category_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, ObjectId]] = None
+) -> List[ProductInDB]:
+    category_oid = parse_object_id(category_id)
+    if category_oid is None:
         return []
     
-    query = {"category_id": ObjectId(category_id)}
-    products = []
-    collection = await get_products_collection()
-    cursor = collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
-    async for document in cursor:
-        products.append(ProductInDB(**document))
-    return products
+    query = {"category_id": category_oid}
+    collection = get_collection("products")
+    cursor = _newest_first_page(collection, query, PRODUCT_LIST_PROJECTION, skip, limit, after)
+    documents = await cursor.to_list(length=limit)
+    return _PRODUCT_LIST.validate_python(documents)
@@ -1,80 +1,110 @@
 from typing import List, Optional
-from datetime import datetime
-from bson import ObjectId
-from app.db.mongodb import get_users_collection
-from app.core.security import get_password_hash, verify_password
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument
+from app.db.mongodb import get_collection
+from app.core.cache import invalidate_user
+from app.core.security import get_password_hash_async, verify_password_async
+from app.models.object_id import NULL_OBJECT_ID, parse_object_id
 from app.models.user import UserInDB, UserCreate, User
 
+# Validates a whole page of documents in one pydantic-core call
+_USER_LIST = TypeAdapter(List[User])
+
+# Never ship password hashes out of the database for listings
+PUBLIC_USER_PROJECTION = {"hashed_password": 0}
+
 async def get_user_by_email(email: str) -> Optional[UserInDB]:
-    collection = await get_users_collection()
+    collection = get_collection("users")
     user_data = await collection.find_one({"email": email})
     if user_data:
         return UserInDB(**user_data)
     return None
 
 async def get_user_by_username(username: str) -> Optional[UserInDB]:
-    collection = await get_users_collection()
+    collection = get_collection("users")
     user_data = await collection.find_one({"username": username})
     if user_data:
         return UserInDB(**user_data)
     return None
 
 async def get_user_by_id(user_id: str) -> Optional[UserInDB]:
-    if not ObjectId.is_valid(user_id):
+    obj_id = parse_object_id(user_id)
+    if obj_id is None or obj_id == NULL_OBJECT_ID:
         return None
-    collection = await get_users_collection()
-    user_data = await collection.find_one({"_id": ObjectId(user_id)})
+    collection = get_collection("users")
+    user_data = await collection.find_one({"_id": obj_id})
     if user_data:
         return UserInDB(**user_data)
     return None
 
-async def create_user(user: UserCreate) -> UserInDB:
-    user_in_db = UserInDB(
+async def create_user(user: UserCreate, *, is_admin: bool = False) -> UserInDB:
+    # UserCreate is already validated, so skip a second validation pass
+    user_in_db = UserInDB.model_construct(
         email=user.email,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await get_password_hash_async(user.password),
         is_active=True,
-        is_admin=False,
+        is_admin=is_admin,
     )
     
-    collection = await get_users_collection()
-    new_user = await collection.insert_one(user_in_db.dict(by_alias=True))
-    created_user = await collection.find_one({"_id": new_user.inserted_id})
-    return UserInDB(**created_user)
+    collection = get_collection("users")
+    await collection.insert_one(user_in_db.model_dump(by_alias=True))
+    
+    # The model already holds exactly what was written (including _id), so no re-read
+    return user_in_db
 
 async def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
     user = await get_user_by_email(email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
 async def update_user(user_id: str, update_data: dict) -> Optional[UserInDB]:
-    if not ObjectId.is_valid(user_id):
+    obj_id = parse_object_id(user_id)
+    if obj_id is None:
         return None
         
     # Handle password update separately
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     
-    update_data["updated_at"] = datetime.utcnow()
+    # The server stamps updated_at; $set is omitted when only the timestamp changes
+    update = {"$currentDate": {"updated_at": True}}
+    if update_data:
+        update["$set"] = update_data
     
-    collection = await get_users_collection()
-    await collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": update_data}
+    collection = get_collection("users")
+    
+    updated_user = await collection.find_one_and_update(
+        {"_id": obj_id},
+        update,
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_user = await collection.find_one({"_id": ObjectId(user_id)})
+    # Drop any cached auth lookups so the next request sees the new state
+    invalidate_user(user_id)
+    
     if updated_user:
         return UserInDB(**updated_user)
     return None
 
-async def get_all_users(skip: int = 0, limit: int = 100) -> List[UserInDB]:
-    users = []
-    collection = await get_users_collection()
-    cursor = collection.find().skip(skip).limit(limit)
-    async for document in cursor:
-        users.append(UserInDB(**document))
-    return users
+async def get_all_users(skip: int = 0, limit: int = 100, after_id: Optional[str] = None) -> Optional[List[User]]:
+    """
+    List users in _id order. With after_id, resume after that id (keyset on _id);
+    returns None when after_id is not a valid ObjectId.
+    """
+    collection = get_collection("users")
+    if after_id is not None:
+        # Keyset pagination walks the _id index instead of scanning past skipped rows
+        after_oid = parse_object_id(after_id)
+        if after_oid is None:
+            return None
+        cursor = collection.find({"_id": {"$gt": after_oid}}, PUBLIC_USER_PROJECTION)
+    else:
+        cursor = collection.find({}, PUBLIC_USER_PROJECTION).skip(skip)
+    # Both paths sort by _id so an after_id page continues the previous page's order
+    cursor = cursor.sort("_id", 1).limit(limit).batch_size(limit)
+    documents = await cursor.to_list(length=limit)
+    return _USER_LIST.validate_python(documents)
@@ -1,39 +1,64 @@
 import asyncio
+import functools
+import heapq
+import itertools
 import pytest
 import pytest_asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
-from typing import Generator, Any, AsyncGenerator
+from typing import Generator, Any, AsyncGenerator, Mapping
 from bson import ObjectId
+from datetime import datetime, timedelta, timezone
 import os
+import re
+import sys
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+# Test-only: hash passwords at bcrypt's minimum cost unless BCRYPT_ROUNDS is set explicitly.
+# Must run before the app is imported, since settings and the CryptContext are built at import
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 from app.main import app
 from app.core.config import settings
+import app.db.mongodb as mongodb
 from app.db.mongodb import get_collection
-from app.services import user_service
-from app.models.user import UserCreate
+from app.models.category import CategoryInDB
+from app.models.product import ProductInDB
+from app.models.user import UserCreate, UserInDB
+from app.core.security import create_access_token, get_password_hash
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
     """
     Fixture that provides an async httpx client connected to the app.
     This fixture uses ASGITransport explicitly to avoid the deprecation warning.
+    Session-scoped (on the session event loop) so the client and transport are built once;
+    tests pass headers per call instead of mutating client.headers.
+    The app's startup and shutdown handlers run once around the whole session.
     """
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test"
-    ) as client:
-        yield client
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            yield client
 
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for each test case."""
+    """Create one event loop shared by the whole test session."""
+    # Run the suite on uvloop, as uvicorn does in production
+    if sys.platform != "win32":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # Create the loop before the try block so a failure here has nothing to close
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.set_event_loop(loop)
     try:
-        loop = asyncio.get_event_loop_policy().new_event_loop()
-        asyncio.set_event_loop(loop)
         yield loop
     finally:
         loop.run_until_complete(loop.shutdown_asyncgens())
@@ -49,372 +74,480 @@ def test_client() -> Generator[TestClient, Any, None]:
         yield client
 
 
-@pytest_asyncio.fixture(scope="session", autouse=True)
-async def setup_test_db():
-    """
-    Create test database and collections, or use a mock for CI environment.
-    """
-    # Use a test database with a different name
-    test_db_name = "ecommerce_test"
-    
-    # Check if we're in CI environment
-    in_ci = os.getenv("GITHUB_ACTIONS") == "true"
+# Shared write results for the mock; plain namespaces are far cheaper to build than MagicMocks
+_DELETED_0 = SimpleNamespace(deleted_count=0)
+_DELETED_1 = SimpleNamespace(deleted_count=1)
+_MODIFIED_0 = SimpleNamespace(modified_count=0)
+_MODIFIED_1 = SimpleNamespace(modified_count=1)
+
+
+class MockCollection:
+    """Mock MongoDB collection for unit tests"""
     
-    # If we're in CI, use mock collections for unit tests
-    if in_ci:
-        print("GITHUB ACTIONS environment detected. Using mock database for unit tests.")
-        
-        # Create mock collections
-        from unittest.mock import AsyncMock, MagicMock
+    def __init__(self, name, indexed_fields=()):
+        self.name = name
+        self.data = {}  # Documents keyed by their _id (ObjectIds are hashable)
+        # Secondary indexes (field -> value -> ids) so lookups on the unique
+        # fields (email, username, category name) skip the full scan
+        self._indexes = {field: {} for field in indexed_fields}
         
-        class MockCollection:
-            """Mock MongoDB collection for unit tests"""
-            
-            def __init__(self, name):
-                self.name = name
-                self.data = {}  # Use dict to store documents by ID
-                
-            async def insert_one(self, document):
-                """Insert a document and return a mock result with inserted_id"""
-                # If no _id, create one
-                if "_id" not in document:
-                    document["_id"] = ObjectId()
-                    
-                # Store the document
-                doc_id = document["_id"]
-                self.data[str(doc_id)] = document.copy()
-                
-                # Return a result object with inserted_id
-                result = MagicMock()
-                result.inserted_id = doc_id
-                return result
-                
-            async def find_one(self, query):
-                """Find one document matching the query"""
-                # Handle _id query
-                if "_id" in query:
-                    doc_id = str(query["_id"])
-                    return self.data.get(doc_id)
-                
-                # Handle other field queries (simple implementation)
-                for doc in self.data.values():
-                    matches = True
-                    for key, value in query.items():
-                        if key not in doc or doc[key] != value:
-                            matches = False
-                            break
-                    if matches:
-                        return doc
-                
-                return None
-                
-            async def delete_many(self, query):
-                """Delete documents matching the query"""
-                # Simple implementation that deletes all documents
-                self.data.clear()
+    def _index(self, doc_id, doc):
+        """Add a stored document to the secondary indexes"""
+        for field, index in self._indexes.items():
+            if field in doc:
+                index.setdefault(doc[field], set()).add(doc_id)
                 
-                # Return a mock result
-                result = MagicMock()
-                result.deleted_count = 1
-                return result
-                
-            async def delete_one(self, query):
-                """Delete one document matching the query"""
-                # Handle _id query
-                if "_id" in query:
-                    doc_id = str(query["_id"])
-                    if doc_id in self.data:
-                        del self.data[doc_id]
-                        result = MagicMock()
-                        result.deleted_count = 1
-                        return result
-                
-                # Return a mock result
-                result = MagicMock()
-                result.deleted_count = 0
-                return result
-                
-            async def update_one(self, query, update):
-                """Update one document matching the query"""
-                # Handle _id query
-                if "_id" in query and "$set" in update:
-                    doc_id = str(query["_id"])
-                    if doc_id in self.data:
-                        # Update the document
-                        for key, value in update["$set"].items():
-                            self.data[doc_id][key] = value
-                        
-                        # Return a mock result
-                        result = MagicMock()
-                        result.modified_count = 1
-                        return result
-                
-                # Return a mock result
-                result = MagicMock()
-                result.modified_count = 0
-                return result
-                
-            async def count_documents(self, query=None):
-                """Count documents matching the query"""
-                if query is None:
-                    return len(self.data)
+    def _unindex(self, doc_id, doc):
+        """Remove a stored document from the secondary indexes"""
+        for field, index in self._indexes.items():
+            ids = index.get(doc.get(field))
+            if ids:
+                ids.discard(doc_id)
+                if not ids:
+                    del index[doc[field]]
                     
-                # Simple implementation
-                count = 0
-                for doc in self.data.values():
-                    matches = True
-                    for key, value in query.items():
-                        if key not in doc or doc[key] != value:
-                            matches = False
-                            break
-                    if matches:
-                        count += 1
-                
-                return count
-                
-            def find(self, query=None):
-                """Return a cursor for the query"""
-                # Create and return a mock cursor
-                cursor = MockCursor(self.data.values())
-                return cursor
+    def _indexed_ids(self, query):
+        """Ids for a single-field equality query on an indexed field, else None"""
+        if len(query) != 1:
+            return None
+        key, value = next(iter(query.items()))
+        if key not in self._indexes or isinstance(value, dict):
+            return None
+        return self._indexes[key].get(value, ())
+        
+    def _matches(self, doc, query):
+        """Check a document against a (simplified) MongoDB filter"""
+        for key, value in query.items():
+            if key == "$text":
+                terms = value["$search"].lower().split()
+                words = []
+                for field_value in doc.values():
+                    if isinstance(field_value, str):
+                        words.append(field_value.lower())
+                    elif isinstance(field_value, list):
+                        words.extend(str(item).lower() for item in field_value)
+                text = " ".join(words)
+                if not any(term in text for term in terms):
+                    return False
+                continue
             
-        class MockCursor:
-            """Mock MongoDB cursor for unit tests"""
+            if key == "$or":
+                if not any(self._matches(doc, sub_query) for sub_query in value):
+                    return False
+                continue
             
-            def __init__(self, data):
-                self.data = list(data)
-                self._limit = None
-                self._skip = 0
-                self._sort_field = None
-                self._sort_dir = 1
-                
-            def skip(self, skip):
-                """Skip N documents"""
-                self._skip = skip
-                return self
-                
-            def limit(self, limit):
-                """Limit to N documents"""
-                self._limit = limit
-                return self
-                
-            def sort(self, field, direction=1):
-                """Sort by field"""
-                self._sort_field = field
-                self._sort_dir = direction
-                return self
-                
-            async def __aiter__(self):
-                """Async iterator implementation"""
-                # Apply skip and limit
-                result = self.data
-                
-                # Apply sort if specified
-                if self._sort_field:
-                    result = sorted(result, 
-                                   key=lambda x: x.get(self._sort_field, ""),
-                                   reverse=(self._sort_dir == -1))
-                
-                # Apply skip and limit
-                start = self._skip
-                end = None if self._limit is None else start + self._limit
+            if key == "$and":
+                if not all(self._matches(doc, sub_query) for sub_query in value):
+                    return False
+                continue
+            
+            field = doc.get(key)
+            if isinstance(value, dict):
+                for op, arg in value.items():
+                    if op == "$in":
+                        values = field if isinstance(field, list) else [field]
+                        matched = any(v in arg for v in values)
+                    elif op == "$gt":
+                        matched = field is not None and field > arg
+                    elif op == "$gte":
+                        matched = field is not None and field >= arg
+                    elif op == "$lt":
+                        matched = field is not None and field < arg
+                    elif op == "$lte":
+                        matched = field is not None and field <= arg
+                    elif op == "$regex":
+                        flags = re.IGNORECASE if "i" in value.get("$options", "") else 0
+                        matched = isinstance(field, str) and re.search(arg, field, flags) is not None
+                    else:
+                        continue
+                    if not matched:
+                        return False
+            elif isinstance(field, list):
+                if value not in field and field != value:
+                    return False
+            elif key not in doc or field != value:
+                return False
+        return True
+        
+    async def insert_one(self, document):
+        """Insert a document and return a mock result with inserted_id"""
+        # If no _id, create one
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+            
+        # Store the document
+        doc_id = document["_id"]
+        self.data[doc_id] = document.copy()
+        self._index(doc_id, document)
+        
+        # Return a result object with inserted_id
+        return SimpleNamespace(inserted_id=doc_id)
+        
+    async def insert_many(self, documents, ordered=True):
+        """Insert several documents and return a mock result with inserted_ids"""
+        inserted_ids = []
+        for document in documents:
+            result = await self.insert_one(document)
+            inserted_ids.append(result.inserted_id)
+        
+        return SimpleNamespace(inserted_ids=inserted_ids)
+        
+    async def find_one(self, query, projection=None):
+        """Find one document matching the query"""
+        # Handle _id query
+        if "_id" in query:
+            doc_id = query["_id"]
+            return self.data.get(doc_id)
+        
+        # Indexed single-field lookups
+        ids = self._indexed_ids(query)
+        if ids is not None:
+            return next((self.data[doc_id] for doc_id in ids), None)
+        
+        # Handle other field queries (simple implementation)
+        for doc in self.data.values():
+            if self._matches(doc, query):
+                return doc
+        
+        return None
+        
+    async def delete_many(self, query):
+        """Delete documents matching the query"""
+        matching = [doc_id for doc_id, doc in self.data.items() if self._matches(doc, query)]
+        for doc_id in matching:
+            self._unindex(doc_id, self.data.pop(doc_id))
+        
+        return SimpleNamespace(deleted_count=len(matching))
+        
+    async def delete_one(self, query):
+        """Delete one document matching the query"""
+        # Handle _id query
+        if "_id" in query:
+            doc_id = query["_id"]
+            if doc_id in self.data:
+                self._unindex(doc_id, self.data.pop(doc_id))
+                return _DELETED_1
+        
+        return _DELETED_0
+        
+    async def update_one(self, query, update):
+        """Update one document matching the query"""
+        # Handle _id query
+        if "_id" in query and "$set" in update:
+            doc_id = query["_id"]
+            if doc_id in self.data:
+                # Update the document
+                self._unindex(doc_id, self.data[doc_id])
+                for key, value in update["$set"].items():
+                    self.data[doc_id][key] = value
+                self._index(doc_id, self.data[doc_id])
                 
-                # Return the sliced data
-                for item in list(result)[start:end]:
-                    yield item
+                return _MODIFIED_1
         
-        # Create mock database and collections
-        users_collection = MockCollection("users")
-        products_collection = MockCollection("products")
-        categories_collection = MockCollection("categories")
+        return _MODIFIED_0
         
-        # Create mock client and database
-        mock_db = MagicMock()
-        mock_db.users = users_collection
-        mock_db.products = products_collection
-        mock_db.categories = categories_collection
+    async def find_one_and_update(self, query, update, projection=None, return_document=False):
+        """Apply $set/$currentDate to the matching document and return it (before or after)"""
+        doc = await self.find_one(query)
+        if doc is None:
+            return None
+        before = dict(doc)
+        doc_id = doc["_id"]
+        self._unindex(doc_id, doc)
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+        for key in update.get("$currentDate", {}):
+            # BSON dates have millisecond precision
+            now = datetime.now(timezone.utc)
+            doc[key] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        self._index(doc_id, doc)
+        return doc if return_document else before
         
-        mock_client = MagicMock()
-        mock_client.__getitem__.return_value = mock_db
+    async def bulk_write(self, requests, ordered=True):
+        """Apply UpdateOne requests (the only kind the services batch)"""
+        matched = 0
+        for request in requests:
+            doc = await self.find_one_and_update(request._filter, request._doc)
+            if doc is not None:
+                matched += 1
         
-        # Create mock functions that return our collections
-        async def get_test_client():
-            return mock_client
-            
-        async def get_test_database():
-            return mock_db
-            
-        async def get_test_products_collection():
-            return products_collection
-            
-        async def get_test_categories_collection():
-            return categories_collection
+        return SimpleNamespace(matched_count=matched, modified_count=matched)
+        
+    async def create_index(self, keys, **kwargs):
+        """Indexes are a no-op for the in-memory mock"""
+        return "mock_index"
+        
+    async def create_indexes(self, indexes):
+        """Indexes are a no-op for the in-memory mock"""
+        return ["mock_index" for _ in indexes]
+        
+    async def count_documents(self, query=None):
+        """Count documents matching the query"""
+        if query is None:
+            return len(self.data)
             
-        async def get_test_users_collection():
-            return users_collection
+        ids = self._indexed_ids(query)
+        if ids is not None:
+            return len(ids)
             
-        # Patch the module
-        import app.db.mongodb
+        # Simple implementation
+        return sum(1 for doc in self.data.values() if self._matches(doc, query))
         
-        # Save the original functions
-        original_get_client = app.db.mongodb.get_client
-        original_get_database = app.db.mongodb.get_database
-        original_get_products_collection = app.db.mongodb.get_products_collection
-        original_get_categories_collection = app.db.mongodb.get_categories_collection
-        original_get_users_collection = app.db.mongodb.get_users_collection
+    def find(self, query=None, projection=None):
+        """Return a cursor for the query"""
+        # Create and return a mock cursor
+        documents = self.data.values()
+        if query:
+            documents = [doc for doc in documents if self._matches(doc, query)]
+        cursor = MockCursor(documents)
+        return cursor
+
+
+class MockCursor:
+    """Mock MongoDB cursor for unit tests"""
+    
+    def __init__(self, data):
+        # Kept as given (a filtered list or the collection's live values view); rows are
+        # only materialised when iterated, and then only as far as skip/limit require
+        self.data = data
+        self._limit = None
+        self._skip = 0
+        self._sort_field = None
+        self._sort_dir = 1
         
-        # Replace with mock functions
-        app.db.mongodb.get_client = get_test_client
-        app.db.mongodb.get_database = get_test_database
-        app.db.mongodb.get_products_collection = get_test_products_collection
-        app.db.mongodb.get_categories_collection = get_test_categories_collection
-        app.db.mongodb.get_users_collection = get_test_users_collection
+    def skip(self, skip):
+        """Skip N documents"""
+        self._skip = skip
+        return self
         
-        # Set global variables
-        app.db.mongodb.client = mock_client
-        app.db.mongodb.database = mock_db
-        app.db.mongodb.products_collection = products_collection
-        app.db.mongodb.categories_collection = categories_collection
-        app.db.mongodb.users_collection = users_collection
+    def limit(self, limit):
+        """Limit to N documents"""
+        self._limit = limit
+        return self
         
-        # Set a reference to the db in app for integration tests
-        app.db = type('DB', (), {})()
-        app.db.mongodb = type('MongoDB', (), {})()
-        app.db.mongodb.get_client = get_test_client
-        app.db.mongodb.get_database = get_test_database
-        app.db.mongodb.get_products_collection = get_test_products_collection
-        app.db.mongodb.get_categories_collection = get_test_categories_collection
-        app.db.mongodb.get_users_collection = get_test_users_collection
-        app.db.mongodb.client = mock_client
-        app.db.mongodb.database = mock_db
+    def batch_size(self, batch_size):
+        """Batch size only affects round trips, not results"""
+        return self
         
-        # Setup complete, yield control back to the tests
-        yield
+    def sort(self, field, direction=1):
+        """Sort by field"""
+        if isinstance(field, list):
+            field, direction = field[0]
+        if isinstance(direction, dict):
+            # $meta sorts (e.g. textScore) keep insertion order
+            return self
+        self._sort_field = field
+        self._sort_dir = direction
+        return self
         
-        # Restore original functions
-        app.db.mongodb.get_client = original_get_client
-        app.db.mongodb.get_database = original_get_database
-        app.db.mongodb.get_products_collection = original_get_products_collection
-        app.db.mongodb.get_categories_collection = original_get_categories_collection
-        app.db.mongodb.get_users_collection = original_get_users_collection
+    async def __aiter__(self):
+        """Async iterator implementation"""
+        start = self._skip
+        end = None if self._limit is None else start + self._limit
+        result = self.data
         
-        # Remove app.db
-        if hasattr(app, 'db'):
-            delattr(app, 'db')
+        # Apply sort if specified; with a limit only the first `end` rows are
+        # selected (nsmallest/nlargest match sorted(...)[:end], ties included)
+        if self._sort_field:
+            key = lambda x: x.get(self._sort_field, "")
+            descending = self._sort_dir == -1
+            if end is None:
+                result = sorted(result, key=key, reverse=descending)
+            elif descending:
+                result = heapq.nlargest(end, result, key=key)
+            else:
+                result = heapq.nsmallest(end, result, key=key)
         
+        # Apply skip and limit without copying
+        for item in itertools.islice(result, start, end):
+            yield item
+            
+    async def to_list(self, length=None):
+        """Collect the cursor results into a list"""
+        if length is not None:
+            self._limit = length if self._limit is None else min(self._limit, length)
+        return [item async for item in self]
+
+
+def _mock_database():
+    """
+    Build the in-memory client, database and collections used in CI.
+    """
+    collections = {
+        "users": MockCollection("users", indexed_fields=("email", "username")),
+        "products": MockCollection("products"),
+        "categories": MockCollection("categories", indexed_fields=("name",)),
+    }
+    
+    mock_db = MagicMock()
+    mock_db.users = collections["users"]
+    mock_db.products = collections["products"]
+    mock_db.categories = collections["categories"]
+    
+    mock_client = MagicMock()
+    mock_client.__getitem__.return_value = mock_db
+    return mock_client, mock_db, collections
+
+
+# Connections the real-Mongo test client opens up front
+_TEST_MIN_POOL_SIZE = 8
+
+
+async def _connect_test_mongo(test_db_name: str):
+    """
+    Connect to a real MongoDB test database, raising if it is unreachable.
+    """
+    # For CI environment, use the exact URL provided
+    if settings.MONGODB_URL.startswith('mongodb+srv://'):
+        # For Atlas URLs, directly use the client with database name
+        test_mongodb_url = settings.MONGODB_URL
+    else:
+        # For standard URLs, try to split off any existing database name
+        # and append our test database name
+        base_url = settings.MONGODB_URL
+        if '/' in base_url[10:]:  # Skip the mongodb:// prefix
+            base_url = settings.MONGODB_URL.rsplit('/', 1)[0]
+        test_mongodb_url = f"{base_url}/{test_db_name}"
+    
+    # Connect to test database with increased timeout; a small pool with a warm floor
+    # is plenty for one session's tests and keeps handshakes off the first requests
+    test_client = AsyncIOMotorClient(
+        test_mongodb_url,
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=5000,
+        minPoolSize=_TEST_MIN_POOL_SIZE,
+        maxPoolSize=32,
+        maxIdleTimeMS=60000,
+        tz_aware=True
+    )
+    
+    # Force a connection to verify it works, then open the rest of the pool floor concurrently
+    try:
+        await test_client.admin.command('ping')
+        await asyncio.gather(*(
+            test_client.admin.command('ping')
+            for _ in range(_TEST_MIN_POOL_SIZE - 1)
+        ))
+    except Exception:
+        test_client.close()
+        raise
+    
+    # No explicit collection creation: MongoDB creates each one on first write
+    test_db = test_client[test_db_name]
+    collections = {name: test_db[name] for name in ("users", "products", "categories")}
+    return test_client, test_db, collections
+
+
+def _patch_database(mp: pytest.MonkeyPatch, client, db, collections) -> None:
+    """
+    Point app.db.mongodb at the given client, database and collections.
+    """
+    async def get_test_client():
+        return client
+    
+    async def get_test_database():
+        return db
+    
+    # get_collection serves from the collection cache; MonkeyPatch restores everything on undo()
+    mp.setattr(mongodb, "get_client", get_test_client)
+    mp.setattr(mongodb, "get_database", get_test_database)
+    mp.setattr(mongodb, "client", client)
+    mp.setattr(mongodb, "database", db)
+    mp.setattr(mongodb, "_collections", dict(collections))
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def setup_test_db():
+    """
+    Create test database and collections, or use a mock for CI environment.
+    """
+    # Use a test database with a different name; under pytest-xdist each worker gets its own,
+    # since every worker's session builds one client and drops its database at the end
+    test_db_name = "ecommerce_test"
+    xdist_worker = os.getenv("PYTEST_XDIST_WORKER")
+    if xdist_worker:
+        test_db_name = f"{test_db_name}_{xdist_worker}"
+    
+    # KEEP_TEST_INDEXES=1 keeps the real test database between sessions and only empties it
+    keep_indexes = bool(os.getenv("KEEP_TEST_INDEXES"))
+    mp = pytest.MonkeyPatch()
+    test_client = None
+    
+    # If we're in CI (or USE_MOCK_MONGO=1 locally), use the in-process mock collections
+    if os.getenv("GITHUB_ACTIONS") == "true" or os.getenv("USE_MOCK_MONGO") == "1":
+        print("CI or USE_MOCK_MONGO detected. Using mock database for unit tests.")
+        _patch_database(mp, *_mock_database())
     else:
         # For local development, try to use a real MongoDB instance
         try:
-            # For CI environment, use the exact URL provided
-            if settings.MONGODB_URL.startswith('mongodb+srv://'):
-                # For Atlas URLs, directly use the client with database name
-                test_mongodb_url = settings.MONGODB_URL
-            else:
-                # For standard URLs, try to split off any existing database name
-                # and append our test database name
-                base_url = settings.MONGODB_URL
-                if '/' in base_url[10:]:  # Skip the mongodb:// prefix
-                    base_url = settings.MONGODB_URL.rsplit('/', 1)[0]
-                test_mongodb_url = f"{base_url}/{test_db_name}"
-            
-            # Get current event loop
-            loop = asyncio.get_event_loop()
-            
-            # Connect to test database with increased timeout
-            test_client = AsyncIOMotorClient(
-                test_mongodb_url,
-                io_loop=loop,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000
-            )
-            
-            # Force a connection to verify it works
-            await test_client.admin.command('ping')
-            
-            # Get test database
-            test_db = test_client[test_db_name]
-            
-            # Create collections if they don't exist
-            collections = await test_db.list_collection_names()
-            if "users" not in collections:
-                await test_db.create_collection("users")
-            if "products" not in collections:
-                await test_db.create_collection("products")
-            if "categories" not in collections:
-                await test_db.create_collection("categories")
-            
-            # Monkey patch the get functions to return test values during tests
-            async def get_test_client():
-                return test_client
-                
-            async def get_test_database():
-                return test_db
-                
-            async def get_test_products_collection():
-                return test_db.products
-                
-            async def get_test_categories_collection():
-                return test_db.categories
-                
-            async def get_test_users_collection():
-                return test_db.users
-            
-            # Patch the module
-            import app.db.mongodb
-            
-            # Save the original functions
-            original_get_client = app.db.mongodb.get_client
-            original_get_database = app.db.mongodb.get_database
-            original_get_products_collection = app.db.mongodb.get_products_collection
-            original_get_categories_collection = app.db.mongodb.get_categories_collection
-            original_get_users_collection = app.db.mongodb.get_users_collection
-            
-            # Replace with test functions
-            app.db.mongodb.get_client = get_test_client
-            app.db.mongodb.get_database = get_test_database
-            app.db.mongodb.get_products_collection = get_test_products_collection
-            app.db.mongodb.get_categories_collection = get_test_categories_collection
-            app.db.mongodb.get_users_collection = get_test_users_collection
-            
-            # Initialize the global variables for tests that directly use them
-            app.db.mongodb.client = test_client
-            app.db.mongodb.database = test_db
-            app.db.mongodb.products_collection = test_db.products
-            app.db.mongodb.categories_collection = test_db.categories
-            app.db.mongodb.users_collection = test_db.users
-            
-            # Set a reference to the db in app for integration tests
-            app.db = type('DB', (), {})()
-            app.db.mongodb = type('MongoDB', (), {})()
-            app.db.mongodb.get_client = get_test_client
-            app.db.mongodb.get_database = get_test_database
-            app.db.mongodb.get_products_collection = get_test_products_collection
-            app.db.mongodb.get_categories_collection = get_test_categories_collection
-            app.db.mongodb.get_users_collection = get_test_users_collection
-            app.db.mongodb.client = test_client
-            app.db.mongodb.database = test_db
-            
-            # Setup complete, yield control back to the tests
-            yield
-            
-            # Clean up: drop test database
-            await test_client.drop_database(test_db_name)
-            
-            # Restore original functions
-            app.db.mongodb.get_client = original_get_client
-            app.db.mongodb.get_database = original_get_database
-            app.db.mongodb.get_products_collection = original_get_products_collection
-            app.db.mongodb.get_categories_collection = original_get_categories_collection
-            app.db.mongodb.get_users_collection = original_get_users_collection
-            
-            # Remove app.db
-            if hasattr(app, 'db'):
-                delattr(app, 'db')
-            
+            test_client, test_db, collections = await _connect_test_mongo(test_db_name)
         except Exception as e:
             print(f"Warning: MongoDB connection failed: {e}. Using mock database for unit tests.")
-            # If MongoDB connection fails, fall back to the mock database approach
-            yield
+        else:
+            _patch_database(mp, test_client, test_db, collections)
+            # Build the production indexes up front so every test (not only those using
+            # async_client's app startup) queries an indexed database; idempotent when kept
+            await mongodb.ensure_indexes()
+    
+    # Setup complete, yield control back to the tests
+    try:
+        yield
+    finally:
+        try:
+            if test_client is not None and keep_indexes:
+                # Clean up: empty the collections concurrently, keeping them and their indexes
+                await asyncio.gather(*(collection.delete_many({}) for collection in collections.values()))
+            elif test_client is not None:
+                # Clean up: drop test database and release the test client
+                await test_client.drop_database(test_db_name)
+        finally:
+            if test_client is not None:
+                test_client.close()
+            mp.undo()
+
+
+async def remove_conflicting_users(*users: UserCreate):
+    """
+    Delete leftovers that share an email or username with any of the users, in one round-trip.
+    """
+    users_collection = get_collection("users")
+    await users_collection.delete_many({
+        "$or": [
+            condition
+            for user_data in users
+            for condition in ({"email": user_data.email}, {"username": user_data.username})
+        ]
+    })
+
+
+@functools.cache
+def hash_test_password(password: str) -> str:
+    """
+    bcrypt is deliberately slow, so each fixture password is hashed once per session.
+    """
+    return get_password_hash(password)
+
+
+def build_test_user(user_data: UserCreate, *, is_admin: bool = False) -> UserInDB:
+    """
+    Build the user user_service.create_user would store, reusing the cached password hash.
+    """
+    return UserInDB.model_construct(
+        email=user_data.email,
+        username=user_data.username,
+        hashed_password=hash_test_password(user_data.password),
+        is_active=True,
+        is_admin=is_admin,
+    )
+
+
+async def insert_test_user(user_data: UserCreate, *, is_admin: bool = False) -> UserInDB:
+    """
+    Store a single test user directly, skipping the register endpoint.
+    """
+    user = build_test_user(user_data, is_admin=is_admin)
+    await get_collection("users").insert_one(user.model_dump(by_alias=True))
+    return user
 
 
 @pytest_asyncio.fixture
@@ -428,20 +561,16 @@ async def sample_user():
         password="password123"
     )
     
-    # Check if user already exists and delete it
-    existing_user = await user_service.get_user_by_email(user_data.email)
-    if existing_user:
-        users_collection = await get_collection("users")
-        await users_collection.delete_one({"_id": existing_user.id})
-    
-    user = await user_service.create_user(user_data)
+    await remove_conflicting_users(user_data)
+    user = await insert_test_user(user_data)
     return user
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def admin_user():
     """
     Create an admin user for testing.
+    Session-scoped: no test modifies the admin, so it (and its token) is built once.
     """
     user_data = UserCreate(
         email="admin@example.com",
@@ -449,24 +578,88 @@ async def admin_user():
         password="password123"
     )
     
-    # Check if user already exists and delete it
-    existing_user = await user_service.get_user_by_email(user_data.email)
-    if existing_user:
-        users_collection = await get_collection("users")
-        await users_collection.delete_one({"_id": existing_user.id})
+    await remove_conflicting_users(user_data)
+    user = await insert_test_user(user_data, is_admin=True)
     
-    user = await user_service.create_user(user_data)
+    # Same shape as the stored document
+    return user.model_dump(by_alias=True)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def registered_users():
+    """
+    Users the auth and profile tests collide with or log in as, inserted once in a single batch.
+    None of the tests modify them, so they are shared for the session.
+    """
+    users = [
+        UserCreate(email="duplicate_email@example.com", username="unique_username", password="password123"),
+        UserCreate(email="unique_email@example.com", username="duplicate_username", password="password123"),
+        UserCreate(email="login_test@example.com", username="login_test_user", password="password123"),
+        UserCreate(email="taken_email@example.com", username="another_user", password="password123"),
+    ]
     
-    # Make user an admin
-    users_collection = await get_collection("users")
-    await users_collection.update_one(
-        {"_id": user.id},
-        {"$set": {"is_admin": True}}
+    await remove_conflicting_users(*users)
+    users_in_db = [build_test_user(user_data) for user_data in users]
+    await get_collection("users").insert_many([user.model_dump(by_alias=True) for user in users_in_db])
+    return users_in_db
+
+
+@pytest_asyncio.fixture
+async def seeded_products():
+    """
+    A fresh category and a few products for the read, filter and search tests, inserted
+    straight into the collections (one concurrent insert each) instead of through the API.
+    Function-scoped because unit tests clear these collections.
+    """
+    category = CategoryInDB(name=f"Seeded Category {ObjectId()}", description="Category seeded for read tests")
+    products = [
+        ProductInDB(name="Seeded Integration Product", description="Mid-priced seeded product",
+                    price=29.99, stock=100, category_id=category.id, tags=["test", "integration"]),
+        ProductInDB(name="Seeded Budget Product", description="Cheap seeded product",
+                    price=9.99, stock=50, category_id=category.id, tags=["test"]),
+        ProductInDB(name="Seeded Premium Product", description="Expensive seeded product",
+                    price=99.99, stock=5, category_id=category.id, tags=["test"]),
+    ]
+    
+    # Direct inserts skip the API's category check, so both writes can be in flight at once
+    await asyncio.gather(
+        get_collection("categories").insert_one(category.model_dump(by_alias=True)),
+        get_collection("products").insert_many([product.model_dump(by_alias=True) for product in products]),
+    )
+    return SimpleNamespace(
+        category_id=str(category.id),
+        product_ids=[str(product.id) for product in products],
+    )
+
+
+@pytest_asyncio.fixture
+async def sample_category_id(admin_auth_headers, async_client):
+    """
+    Create a sample category through the API and return its ID.
+    The name is unique per call since category names are unique and tests share the database;
+    function-scoped because tests rename it and the unit tests clear the collection.
+    """
+    response = await async_client.post(
+        "/api/v1/categories/",
+        headers=admin_auth_headers,
+        json={
+            "name": f"Test Integration Category {uuid4().hex[:8]}",
+            "description": "A category for integration testing"
+        }
     )
     
-    # Get updated user
-    user_dict = await users_collection.find_one({"_id": user.id})
-    return user_dict
+    data = response.json()
+    return data["id"]
+
+
+@functools.lru_cache(maxsize=2)
+def auth_headers_for(user_id: str) -> Mapping[str, str]:
+    """
+    Read-only bearer headers for a user, signed once and reused while that user is current.
+    Tokens last a day so a cached one outlives any test run.
+    """
+    access_token = create_access_token(subject=user_id, expires_delta=timedelta(days=1))
+    return MappingProxyType({"Authorization": f"Bearer {access_token}"})
 
 
 @pytest_asyncio.fixture
@@ -474,18 +667,12 @@ async def auth_headers(sample_user):
     """
     Create auth headers for testing.
     """
-    from app.core.security import create_access_token
-    
-    access_token = create_access_token(subject=str(sample_user.id))
-    return {"Authorization": f"Bearer {access_token}"}
+    return auth_headers_for(str(sample_user.id))
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def admin_auth_headers(admin_user):
     """
     Create admin auth headers for testing.
     """
-    from app.core.security import create_access_token
-    
-    access_token = create_access_token(subject=str(admin_user["_id"]))
-    return {"Authorization": f"Bearer {access_token}"}
\ No newline at end of file
+    return auth_headers_for(str(admin_user["_id"]))
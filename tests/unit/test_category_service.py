@@ -1,10 +1,26 @@
 import pytest
+import pytest_asyncio
 from bson import ObjectId
 from datetime import datetime
 
 from app.models.category import CategoryCreate, CategoryUpdate
 from app.services import category_service
-from app.db.mongodb import get_categories_collection
+from app.db.mongodb import get_collection
+
+
+@pytest_asyncio.fixture
+async def fresh_category(request):
+    """
+    Create a category named by the test's indirect parameter, replacing any leftover.
+    """
+    category_data = CategoryCreate(
+        name=request.param,
+        description=f"A category for testing {request.param}"
+    )
+    
+    categories_collection = get_collection("categories")
+    await categories_collection.delete_many({"name": category_data.name})
+    return await category_service.create_category(category_data)
 
 
 @pytest.mark.asyncio
@@ -16,7 +32,7 @@ async def test_create_category():
     )
     
     # First delete the category if it exists
-    categories_collection = await get_categories_collection()
+    categories_collection = get_collection("categories")
     await categories_collection.delete_many({"name": category_data.name})
     
     # Act
@@ -32,30 +48,18 @@ async def test_create_category():
 
 
 @pytest.mark.asyncio
-async def test_get_category_by_id():
+@pytest.mark.parametrize("fresh_category", ["Category for Get By ID"], indirect=True)
+async def test_get_category_by_id(fresh_category):
     # Arrange
-    category_data = CategoryCreate(
-        name="Category for Get By ID",
-        description="A category for testing get by ID"
-    )
-    
-    # First delete the category if it exists
-    categories_collection = await get_categories_collection()
-    await categories_collection.delete_many({"name": category_data.name})
-    
-    # Create a category
-    created_category = await category_service.create_category(category_data)
-    
-    # Convert to string explicitly
-    category_id = str(created_category.id)
+    category_id = str(fresh_category.id)
     
     # Act - Get the category by ID
     category = await category_service.get_category_by_id(category_id)
     
     # Assert
     assert category is not None, f"Could not find category with ID: {category_id}"
-    assert category.name == category_data.name
-    assert category.description == category_data.description
+    assert category.name == fresh_category.name
+    assert category.description == fresh_category.description
     
     # Test non-existent category
     non_existent_category = await category_service.get_category_by_id("000000000000000000000000")
@@ -63,27 +67,15 @@ async def test_get_category_by_id():
 
 
 @pytest.mark.asyncio
-async def test_get_category_by_name():
-    # Arrange
-    category_name = "Category for Get By Name"
-    category_data = CategoryCreate(
-        name=category_name,
-        description="A category for testing get by name"
-    )
-    
-    # First delete the category if it exists
-    categories_collection = await get_categories_collection()
-    await categories_collection.delete_many({"name": category_data.name})
-    
-    created_category = await category_service.create_category(category_data)
-    
+@pytest.mark.parametrize("fresh_category", ["Category for Get By Name"], indirect=True)
+async def test_get_category_by_name(fresh_category):
     # Act
-    category = await category_service.get_category_by_name(category_name)
+    category = await category_service.get_category_by_name(fresh_category.name)
     
     # Assert
     assert category is not None
-    assert category.name == category_name
-    assert category.description == category_data.description
+    assert category.name == fresh_category.name
+    assert category.description == fresh_category.description
     
     # Test non-existent category
     non_existent_category = await category_service.get_category_by_name("Non-existent Category")
@@ -91,26 +83,15 @@ async def test_get_category_by_name():
 
 
 @pytest.mark.asyncio
-async def test_update_category():
-    # Arrange
-    category_data = CategoryCreate(
-        name="Category for Update",
-        description="A category for testing update"
-    )
-    
-    # First delete the category if it exists
-    categories_collection = await get_categories_collection()
-    await categories_collection.delete_many({"name": category_data.name})
-    
-    created_category = await category_service.create_category(category_data)
-    
-    # Update data
+@pytest.mark.parametrize("fresh_category", ["Category for Update"], indirect=True)
+async def test_update_category(fresh_category):
+    # Arrange - Update data
     new_name = "Updated Category Name"
     new_description = "Updated category description"
     update_data = {"name": new_name, "description": new_description}
     
     # Act
-    updated_category = await category_service.update_category(str(created_category.id), update_data)
+    updated_category = await category_service.update_category(str(fresh_category.id), update_data)
     
     # Assert
     assert updated_category is not None
@@ -122,7 +103,7 @@ async def test_update_category():
     
     # Act
     partially_updated_category = await category_service.update_category(
-        str(created_category.id), partial_update
+        str(fresh_category.id), partial_update
     )
     
     # Assert
@@ -132,34 +113,65 @@ async def test_update_category():
 
 
 @pytest.mark.asyncio
-async def test_delete_category():
+async def test_cached_category_invalidated_on_update():
     # Arrange
     category_data = CategoryCreate(
-        name="Category for Delete",
-        description="A category for testing delete"
+        name="Category for Cache",
+        description="A category for testing the lookup cache"
     )
     
-    # First delete the category if it exists
-    categories_collection = await get_categories_collection()
-    await categories_collection.delete_many({"name": category_data.name})
+    categories_collection = get_collection("categories")
+    await categories_collection.delete_many({"name": {"$in": [category_data.name, "Renamed Cached Category"]}})
     
     created_category = await category_service.create_category(category_data)
+    category_id = str(created_category.id)
+    
+    # Warm the cache by id and by name
+    assert await category_service.get_category_by_id(category_id) is not None
+    assert await category_service.get_category_by_name(category_data.name) is not None
+    
+    # Act
+    await category_service.update_category(category_id, {"name": "Renamed Cached Category"})
     
+    # Assert - neither lookup serves the stale entry
+    fetched_category = await category_service.get_category_by_id(category_id)
+    assert fetched_category.name == "Renamed Cached Category"
+    assert await category_service.get_category_by_name(category_data.name) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fresh_category", ["Category Deleted Elsewhere"], indirect=True)
+async def test_write_checks_bypass_category_cache(fresh_category):
+    # Arrange - warm the cache, then delete behind its back as another worker would
+    category_id = str(fresh_category.id)
+    assert await category_service.get_category_by_id(category_id) is not None
+    
+    categories_collection = get_collection("categories")
+    await categories_collection.delete_many({"name": fresh_category.name})
+    
+    # Act / Assert - existence and uniqueness checks still see the database
+    assert await category_service.category_exists(category_id) is False
+    assert await category_service.category_name_exists(fresh_category.name) is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fresh_category", ["Category for Delete"], indirect=True)
+async def test_delete_category(fresh_category):
     # Act
-    result = await category_service.delete_category(str(created_category.id))
+    result = await category_service.delete_category(str(fresh_category.id))
     
     # Assert
     assert result is True
     
     # Verify category no longer exists
-    deleted_category = await category_service.get_category_by_id(str(created_category.id))
+    deleted_category = await category_service.get_category_by_id(str(fresh_category.id))
     assert deleted_category is None
 
 
 @pytest.mark.asyncio
 async def test_get_all_categories():
     # Arrange - Clear existing categories
-    categories_collection = await get_categories_collection()
+    categories_collection = get_collection("categories")
     await categories_collection.delete_many({})
     
     # Create multiple categories
@@ -1,31 +1,32 @@
+import json
 import pytest
 import pytest_asyncio
 from bson import ObjectId
 from datetime import datetime
+from types import SimpleNamespace
 
 from app.models.product import ProductCreate, ProductUpdate
 from app.models.category import CategoryCreate
+from app.schemas.product import ProductResponse, products_to_json
 from app.services import product_service, category_service
-from app.db.mongodb import get_categories_collection, get_products_collection
+from app.db.mongodb import get_collection
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="module")
 async def sample_category():
     """
     Create a sample category for testing.
+    Module-scoped: the product tests only reference its id, so one category serves them all.
     """
     category_data = CategoryCreate(
-        name="Test Category",
+        name="Test Category Shared",
         description="A category for testing products"
     )
     
-    # Check if category already exists and delete it
-    existing_category = await category_service.get_category_by_name(category_data.name)
-    if existing_category:
-        categories_collection = await get_categories_collection()
-        await categories_collection.delete_one({"_id": existing_category.id})
-    
-    category = await category_service.create_category(category_data)
+    # Reuse the category if an earlier run left it behind
+    category = await category_service.get_category_by_name(category_data.name)
+    if category is None:
+        category = await category_service.create_category(category_data)
     return category
 
 
@@ -51,7 +52,7 @@ async def test_create_product(sample_category):
     assert product.description == product_data.description
     assert product.price == product_data.price
     assert product.stock == product_data.stock
-    assert str(product.category_id) == str(sample_category.id)
+    assert product.category_id == sample_category.id
     assert product.is_active == product_data.is_active
     assert product.tags == product_data.tags
 
@@ -75,7 +76,7 @@ async def test_get_product_by_id(sample_category):
     
     # Assert
     assert product is not None
-    assert str(product.id) == str(created_product.id)
+    assert product.id == created_product.id
     assert product.name == product_data.name
     assert product.description == product_data.description
     
@@ -141,7 +142,7 @@ async def test_delete_product(sample_category):
 @pytest.mark.asyncio
 async def test_get_all_products(sample_category):
     # Arrange - Clear existing products
-    products_collection = await get_products_collection()
+    products_collection = get_collection("products")
     await products_collection.delete_many({})
     
     # Create multiple products
@@ -163,8 +164,7 @@ async def test_get_all_products(sample_category):
         is_active=True
     )
     
-    await product_service.create_product(product_data1)
-    await product_service.create_product(product_data2)
+    await product_service.bulk_create_products([product_data1, product_data2])
     
     # Act
     products = await product_service.get_all_products()
@@ -184,10 +184,107 @@ async def test_get_all_products(sample_category):
     assert not any(p.name == "Product 1" for p in price_filtered_products)
 
 
+@pytest.mark.asyncio
+async def test_get_all_products_keyset_pagination(sample_category):
+    # Arrange - Clear existing products
+    products_collection = get_collection("products")
+    await products_collection.delete_many({})
+    
+    for i in range(3):
+        await product_service.create_product(ProductCreate(
+            name=f"Paged Product {i}",
+            description="Keyset pagination test product",
+            price=10.0 + i,
+            stock=10,
+            category_id=str(sample_category.id)
+        ))
+    
+    # Act
+    first_page = await product_service.get_all_products(limit=2)
+    last = first_page[-1]
+    second_page = await product_service.get_all_products(limit=2, after=(last.created_at, last.id))
+    
+    # A filter with its own $or keeps it alongside the keyset condition, and is not modified
+    filter_params = {"$or": [{"price": 10.0}, {"price": 12.0}], "category_id": str(sample_category.id)}
+    filter_copy = {**filter_params}
+    filtered_page = await product_service.get_all_products(
+        limit=2, filter_params=filter_params, after=(last.created_at, last.id)
+    )
+    
+    # Assert - newest first, and the second page resumes after the first without overlap
+    assert [p.name for p in first_page] == ["Paged Product 2", "Paged Product 1"]
+    assert [p.name for p in second_page] == ["Paged Product 0"]
+    assert [p.name for p in filtered_page] == ["Paged Product 0"]
+    assert filter_params == filter_copy
+
+
+@pytest.mark.asyncio
+async def test_bulk_product_operations(sample_category):
+    # Arrange - Clear existing products
+    products_collection = get_collection("products")
+    await products_collection.delete_many({})
+    
+    # Act - create, patch and delete in batches
+    created = await product_service.bulk_create_products([
+        ProductCreate(
+            name=f"Bulk Product {i}",
+            description="Bulk operation test product",
+            price=5.0 + i,
+            stock=10,
+            category_id=str(sample_category.id)
+        )
+        for i in range(3)
+    ])
+    matched, modified = await product_service.bulk_update_products([
+        (str(created[0].id), {"price": 50.0}),
+        (str(created[1].id), {"stock": 0}),
+    ])
+    deleted = await product_service.bulk_delete_products([str(created[2].id)])
+    
+    # Assert
+    assert len(created) == 3
+    assert (matched, modified) == (2, 2)
+    assert deleted == 1
+    
+    # A batch with an invalid id is rejected whole
+    assert await product_service.bulk_update_products([
+        (str(created[0].id), {"price": 1.0}),
+        ("invalid-id", {"stock": 1}),
+    ]) is None
+    assert await product_service.bulk_delete_products([str(created[0].id), "invalid-id"]) is None
+    assert (await product_service.get_product_by_id(str(created[0].id))).price == 50.0
+    assert (await product_service.get_product_by_id(str(created[1].id))).stock == 0
+    assert await product_service.get_product_by_id(str(created[2].id)) is None
+
+
+@pytest.mark.asyncio
+async def test_products_to_json(sample_category):
+    # Arrange
+    product = await product_service.create_product(ProductCreate(
+        name="Serialized Product",
+        description="JSON serialization test product",
+        price=12.5,
+        stock=3,
+        category_id=str(sample_category.id)
+    ))
+    
+    # The same product carrying a field that ProductResponse does not declare
+    stored_product = SimpleNamespace(**product.model_dump(), supplier_cost=4.2)
+    
+    # Act
+    data = json.loads(products_to_json([product, stored_product]))
+    
+    # Assert - exactly the ProductResponse fields: string ids under "id", no "_id", nothing extra
+    assert set(data[0]) == set(ProductResponse.model_fields)
+    assert data[0]["id"] == str(product.id)
+    assert data[0]["category_id"] == str(sample_category.id)
+    assert data[1] == data[0]
+
+
 @pytest.mark.asyncio
 async def test_search_products(sample_category):
     # Arrange - Clear existing products
-    products_collection = await get_products_collection()
+    products_collection = get_collection("products")
     await products_collection.delete_many({})
     
     # Create products with searchable terms
@@ -209,8 +306,7 @@ async def test_search_products(sample_category):
         tags=["electronics", "computer", "laptop"]
     )
     
-    await product_service.create_product(product_data1)
-    await product_service.create_product(product_data2)
+    await product_service.bulk_create_products([product_data1, product_data2])
     
     # Act - Search by name
     smartphone_results = await product_service.search_products("Smartphone")
@@ -235,13 +331,13 @@ async def test_search_products(sample_category):
 
 @pytest.mark.asyncio
 async def test_get_products_by_category(sample_category):
-    # Arrange - Clear existing products
-    products_collection = await get_products_collection()
-    await products_collection.delete_many({})
+    # Arrange - Clear products left in the shared category by earlier tests
+    products_collection = get_collection("products")
+    await products_collection.delete_many({"category_id": sample_category.id})
     
-    # Create multiple products in the same category
-    for i in range(3):
-        product_data = ProductCreate(
+    # Create multiple products in the same category in one batch
+    await product_service.bulk_create_products([
+        ProductCreate(
             name=f"Category Product {i+1}",
             description=f"Product {i+1} in test category",
             price=10.99 * (i+1),
@@ -249,7 +345,8 @@ async def test_get_products_by_category(sample_category):
             category_id=str(sample_category.id),
             is_active=True
         )
-        await product_service.create_product(product_data)
+        for i in range(3)
+    ])
     
     # Create a different category and product
     other_category = await category_service.create_category(
@@ -272,7 +369,7 @@ async def test_get_products_by_category(sample_category):
     # Assert
     assert len(category_products) == 3
     for product in category_products:
-        assert str(product.category_id) == str(sample_category.id)
+        assert product.category_id == sample_category.id
     
     # Check other category
     other_category_products = await product_service.get_products_by_category(str(other_category.id))
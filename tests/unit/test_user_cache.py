@@ -0,0 +1,105 @@
+import time
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+
+from app.api.deps import _resolve_user
+from app.core.cache import cache_user, get_cached_user, invalidate_user, token_key
+from app.core.security import create_access_token
+from app.models.user import UserInDB
+from app.services import user_service
+
+
+@pytest.fixture
+def get_user_calls(monkeypatch):
+    """
+    Count the database lookups _resolve_user makes, passing each through.
+    """
+    calls = []
+    get_user_by_id = user_service.get_user_by_id
+    
+    async def counting_get_user_by_id(user_id):
+        calls.append(user_id)
+        return await get_user_by_id(user_id)
+    
+    monkeypatch.setattr(user_service, "get_user_by_id", counting_get_user_by_id)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_repeat_request_served_from_cache(sample_user, get_user_calls):
+    # Arrange
+    token = create_access_token(subject=str(sample_user.id))
+    
+    # Act
+    first = await _resolve_user(token)
+    second = await _resolve_user(token)
+    
+    # Assert - only the first request reached the database
+    assert first.id == second.id == sample_user.id
+    assert get_user_calls == [str(sample_user.id)]
+
+
+@pytest.mark.asyncio
+async def test_deactivation_seen_on_next_request(sample_user):
+    # Arrange - warm the cache
+    token = create_access_token(subject=str(sample_user.id))
+    await _resolve_user(token, require_active=True)
+    
+    # Act
+    await user_service.update_user(str(sample_user.id), {"is_active": False})
+    
+    # Assert
+    with pytest.raises(HTTPException) as exc_info:
+        await _resolve_user(token, require_active=True)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_email_and_password_change_seen_on_next_request(sample_user, get_user_calls):
+    # Arrange - warm the cache
+    token = create_access_token(subject=str(sample_user.id))
+    await _resolve_user(token)
+    
+    # Act
+    await user_service.update_user(
+        str(sample_user.id),
+        {"email": "cache_updated@example.com", "password": "newpassword123"}
+    )
+    user = await _resolve_user(token)
+    
+    # Assert - the update forced a fresh lookup
+    assert len(get_user_calls) == 2
+    assert user.email == "cache_updated@example.com"
+    assert user.hashed_password != sample_user.hashed_password
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_not_served(sample_user):
+    # Arrange - an entry whose token expired a second ago
+    token = create_access_token(subject=str(sample_user.id), expires_delta=timedelta(seconds=-1))
+    cache_user(token_key(token), sample_user, time.time() - 1)
+    
+    # Act / Assert - the entry is dropped and the expired token is rejected
+    assert get_cached_user(token_key(token)) is None
+    with pytest.raises(HTTPException) as exc_info:
+        await _resolve_user(token)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_drops_only_that_user(sample_user, admin_user):
+    # Arrange - two tokens for the sample user, one for the admin
+    sample_keys = [token_key("sample-token-1"), token_key("sample-token-2")]
+    admin_key = token_key("admin-token")
+    expires_at = time.time() + 60
+    for key in sample_keys:
+        cache_user(key, sample_user, expires_at)
+    cache_user(admin_key, UserInDB(**admin_user), expires_at)
+    
+    # Act
+    invalidate_user(sample_user.id)
+    
+    # Assert
+    assert all(get_cached_user(key) is None for key in sample_keys)
+    assert get_cached_user(admin_key) is not None
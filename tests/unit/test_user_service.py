@@ -5,7 +5,7 @@ from datetime import datetime
 
 from app.models.user import UserCreate
 from app.services import user_service
-from app.db.mongodb import get_users_collection
+from app.db.mongodb import get_collection
 
 
 @pytest.mark.asyncio
@@ -18,7 +18,7 @@ async def test_create_user():
     )
     
     # First delete the user if it exists
-    users_collection = await get_users_collection()
+    users_collection = get_collection("users")
     await users_collection.delete_many({"email": user_data.email})
     
     # Act
@@ -32,6 +32,28 @@ async def test_create_user():
     assert user.hashed_password != user_data.password  # Password should be hashed
 
 
+@pytest.mark.asyncio
+async def test_create_admin_user():
+    # Arrange
+    user_data = UserCreate(
+        email="test_create_admin@example.com",
+        username="test_create_admin",
+        password="password123"
+    )
+    
+    users_collection = get_collection("users")
+    await users_collection.delete_many({"email": user_data.email})
+    
+    # Act
+    user = await user_service.create_user(user_data, is_admin=True)
+    
+    # Assert
+    assert user is not None
+    assert user.is_admin is True
+    stored = await users_collection.find_one({"email": user_data.email})
+    assert stored["is_admin"] is True
+
+
 @pytest.mark.asyncio
 async def test_get_user_by_email():
     # Arrange
@@ -46,7 +68,7 @@ async def test_get_user_by_email():
     )
     
     # First delete the user if it exists
-    users_collection = await get_users_collection()
+    users_collection = get_collection("users")
     await users_collection.delete_many({"email": email})
     
     created_user = await user_service.create_user(user_data)
@@ -74,7 +96,7 @@ async def test_get_user_by_username():
     )
     
     # First delete the user if it exists
-    users_collection = await get_users_collection()
+    users_collection = get_collection("users")
     await users_collection.delete_many({"username": username})
     
     created_user = await user_service.create_user(user_data)
@@ -103,7 +125,7 @@ async def test_authenticate_user():
     )
     
     # First delete the user if it exists
-    users_collection = await get_users_collection()
+    users_collection = get_collection("users")
     await users_collection.delete_many({"email": email})
     
     created_user = await user_service.create_user(user_data)
@@ -136,7 +158,7 @@ async def test_update_user():
     )
     
     # First delete the user if it exists
-    users_collection = await get_users_collection()
+    users_collection = get_collection("users")
     await users_collection.delete_many({"email": email})
     
     created_user = await user_service.create_user(user_data)